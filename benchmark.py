@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import numpy as np
+import pandas as pd
+from panel import process_panel_data, to_panel
+from moments import cycle_moments
+from cross_country import build_statistics_table, compare_cycles
+from series_store import ingest_csv, load_series
+from render import render_figures, trends_job
+
+VARIABLES = ['gdp', 'consumption', 'investment']
+STAGES = ['ingest', 'load', 'process', 'statistics', 'table', 'compare', 'render']
+
+# (nobs, nseries) grids: longer series for 3 variables, more series at 120 quarters
+OBS_GRID = [120, 1_000, 10_000, 100_000, 1_000_000]
+SERIES_GRID = [3, 30, 300, 3_000, 10_000]
+QUICK_OBS_GRID = [120, 1_000, 10_000]
+QUICK_SERIES_GRID = [3, 30, 300]
+
+# Largest case (nobs, nseries) a stage is run on: rendering one figure per
+# country at 10^6 points only measures matplotlib
+STAGE_LIMITS = {'render': (100_000, 30)}
+
+
+def _dates(nobs):
+    # quarterly dates run past pandas' Timestamp range beyond ~2000 periods
+    return pd.date_range('1950-01-01', periods=nobs, freq='QS' if nobs <= 1000 else 'h')
+
+
+def synthetic_data(nobs, nseries, seed=0):
+    """
+    Random-walk-with-drift levels shaped like get_macro_data output
+
+    Returns:
+    dict: {country: {variable: pd.Series}} with ceil(nseries / 3) countries
+    """
+    rng = np.random.default_rng(seed)
+    index = _dates(nobs)
+    # the drift shrinks with the length so 10^6-point levels stay finite
+    drift = 0.005 * min(1.0, 1000 / nobs)
+    levels = np.exp(np.cumsum(rng.normal(drift, 0.01, size=(nobs, nseries)), axis=0) + 10)
+    data = {}
+    for j in range(nseries):
+        country = f"C{j // len(VARIABLES):05d}"
+        var = VARIABLES[j % len(VARIABLES)]
+        data.setdefault(country, {})[var] = pd.Series(levels[:, j], index=index, name=var)
+    return data
+
+
+def _within_limits(stage, nobs, nseries):
+    max_obs, max_series = STAGE_LIMITS.get(stage, (np.inf, np.inf))
+    return nobs <= max_obs and nseries <= max_series
+
+
+def _timeit(func, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run_case(nobs, nseries, stages=STAGES, repeats=3, method='hp', workdir=None):
+    """
+    Time each pipeline stage on one synthetic case
+
+    The stages mirror analyze_business_cycles: CSV ingest and store loading,
+    process_cycle_data, calculate_statistics, create_statistics_table,
+    compare_cycle_statistics and figure rendering.
+
+    Returns:
+    list: One result dict per stage that was run
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix='macro_bench_')
+    data = synthetic_data(nobs, nseries)
+    timings = {}
+
+    if 'ingest' in stages or 'load' in stages:
+        csv_path = os.path.join(workdir, f"bench_{nobs}_{nseries}.csv")
+        frame = to_panel(data)
+        frame.columns = [f"{c}_{v}" for c, v in frame.columns]
+        frame.rename_axis('observation_date').to_csv(csv_path)
+        store_dir = os.path.join(workdir, 'store')
+        if 'ingest' in stages:
+            timings['ingest'] = _timeit(lambda: ingest_csv(csv_path, store_dir), repeats)
+        if 'load' in stages:
+            load_series(csv_path, store_dir=store_dir)
+            timings['load'] = _timeit(
+                lambda: load_series(csv_path, store_dir=store_dir).to_numpy().sum(), repeats)
+
+    cycles, trends = process_panel_data(data, method=method)
+    if 'process' in stages:
+        timings['process'] = _timeit(lambda: process_panel_data(data, method=method), repeats)
+    moments = cycle_moments(to_panel(cycles))
+    if 'statistics' in stages:
+        timings['statistics'] = _timeit(lambda: cycle_moments(to_panel(cycles)), repeats)
+    if 'table' in stages:
+        by_country = {c: moments.xs(c, level='country') for c in cycles}
+        timings['table'] = _timeit(lambda: build_statistics_table(by_country), repeats)
+    if 'compare' in stages and len(cycles) > 1 and _within_limits('compare', nobs, nseries):
+        timings['compare'] = _timeit(lambda: compare_cycles(cycles), repeats)
+    if 'render' in stages and _within_limits('render', nobs, nseries):
+        jobs = [trends_job(c, data[c], cycles[c], trends[c]) for c in cycles]
+        out_dir = os.path.join(workdir, 'figures')
+        timings['render'] = _timeit(
+            lambda: render_figures(jobs, out_dir, processes=1, dpi=100, force=True), 1)
+
+    return [{'stage': stage, 'nobs': nobs, 'nseries': nseries, 'method': method,
+             'repeats': len(times), 'min': min(times), 'median': float(np.median(times))}
+            for stage, times in timings.items()]
+
+
+def run_suite(obs_grid=OBS_GRID, series_grid=SERIES_GRID, stages=STAGES, repeats=3,
+              method='hp', verbose=True):
+    """
+    Run every stage over the length grid (3 series) and the width grid (120 obs)
+
+    Returns:
+    dict: {'meta': environment, 'results': [result dicts]}
+    """
+    cases = [(nobs, 3) for nobs in obs_grid] + [(120, n) for n in series_grid if n != 3]
+    results = []
+    with tempfile.TemporaryDirectory(prefix='macro_bench_') as workdir:
+        for nobs, nseries in cases:
+            for result in run_case(nobs, nseries, stages, repeats, method, workdir):
+                results.append(result)
+                if verbose:
+                    print(f"{result['stage']:<11} nobs={nobs:<8} nseries={nseries:<6} "
+                          f"min={result['min'] * 1e3:10.2f} ms")
+    meta = {'python': platform.python_version(), 'numpy': np.__version__,
+            'pandas': pd.__version__, 'machine': platform.machine(),
+            'time': pd.Timestamp.now().isoformat(timespec='seconds')}
+    return {'meta': meta, 'results': results}
+
+
+def _key(result):
+    return (result['stage'], result['nobs'], result['nseries'], result['method'])
+
+
+def compare_to_baseline(results, baseline, threshold=1.25, min_seconds=1e-3):
+    """
+    Compare a run with a stored baseline run
+
+    A case is a regression when its best time is more than threshold times
+    the baseline's; cases that now take less than min_seconds are too noisy
+    to judge and never flagged.
+
+    Returns:
+    pd.DataFrame: One row per case present in both runs, with the ratio and
+        a 'regression' flag
+    """
+    base = {_key(r): r for r in baseline['results']}
+    rows = []
+    for result in results['results']:
+        ref = base.get(_key(result))
+        if ref is None:
+            continue
+        ratio = result['min'] / ref['min']
+        rows.append(dict(zip(['stage', 'nobs', 'nseries', 'method'], _key(result)),
+                         baseline=ref['min'], current=result['min'], ratio=ratio,
+                         regression=bool(ratio > threshold and result['min'] > min_seconds)))
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the business cycle pipeline")
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help="JSON file for the results")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio flagged as a regression")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--method', default='hp', help="Filter used by process_cycle_data")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--quick', action='store_true',
+                        help="Only run up to 10^4 points and 300 series")
+    args = parser.parse_args(argv)
+
+    obs_grid, series_grid = ((QUICK_OBS_GRID, QUICK_SERIES_GRID) if args.quick
+                             else (OBS_GRID, SERIES_GRID))
+    results = run_suite(obs_grid, series_grid, args.stages, args.repeats, args.method)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare_to_baseline(results, baseline, args.threshold)
+        if comparison.empty:
+            print("No cases in common with the baseline")
+            return 0
+        print(comparison.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+        regressions = comparison[comparison['regression']]
+        if len(regressions):
+            print(f"{len(regressions)} regression(s) above {args.threshold:g}x")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from moments import _moments, _reference_positions, statistics_table
+
+STATS = ['std_dev', 'autocorr', 'corr_with_gdp']
+
+
+def block_indices(rng, nobs, size, block_length, method='moving'):
+    """
+    Time indices for block-bootstrap resamples, drawn all at once
+
+    Parameters:
+    rng (np.random.Generator): Random number generator
+    nobs (int): Sample length
+    size (int): Number of resamples
+    block_length (float): Block length (mean block length for 'stationary')
+    method (str): 'moving' (fixed-length overlapping blocks) or
+        'stationary' (geometric block lengths, Politis-Romano)
+
+    Returns:
+    ndarray: (size, nobs) integer indices into the sample
+    """
+    if method == 'moving':
+        block_length = int(block_length)
+        nblocks = -(-nobs // block_length)
+        starts = rng.integers(0, nobs - block_length + 1, size=(size, nblocks))
+        idx = (starts[:, :, None] + np.arange(block_length)).reshape(size, -1)
+        return idx[:, :nobs]
+    if method == 'stationary':
+        # Start a new block with probability 1/block_length, otherwise step
+        # forward (wrapping around the end of the sample)
+        new_block = rng.random((size, nobs)) < 1.0 / block_length
+        new_block[:, 0] = True
+        block_first = np.maximum.accumulate(np.where(new_block, np.arange(nobs), 0), axis=1)
+        block_start = np.take_along_axis(rng.integers(0, nobs, size=(size, nobs)),
+                                         block_first, axis=1)
+        return (block_start + np.arange(nobs) - block_first) % nobs
+    raise ValueError(f"Unknown bootstrap method: {method}")
+
+
+def _replicate_moments(values, ref, seed, size, block_length, method):
+    """
+    Moments of size bootstrap replicates of a panel: (size, 3, nseries)
+    """
+    rng = np.random.default_rng(seed)
+    idx = block_indices(rng, values.shape[0], size, block_length, method)
+    return np.stack(_moments(values[idx], ref), axis=1)
+
+
+def bootstrap_moments(panel, replicates=2000, block_length=8, method='moving',
+                      seed=0, processes=None, chunk_size=250):
+    """
+    Block-bootstrap distribution of the moments of a cycle panel
+
+    Time periods are resampled jointly for every column, so cross-country
+    and cross-variable dependence is preserved. Replicates are computed in
+    vectorized chunks spread over a process pool; each chunk has its own
+    seed spawned from seed, so results do not depend on the number of
+    processes.
+
+    Parameters:
+    panel (pd.DataFrame): Cyclical components with (country, variable) or
+        variable columns
+    replicates (int): Number of bootstrap replicates
+    block_length (float): (Mean) block length in periods
+    method (str): 'moving' or 'stationary'
+    seed (int): Seed for the whole run
+    processes (int): Worker processes (None: one per CPU, 1: no pool)
+    chunk_size (int): Replicates per task
+
+    Returns:
+    ndarray: (replicates, 3, nseries) array of std_dev, autocorr and
+        corr_with_gdp
+    """
+    values = panel.to_numpy(dtype=float)
+    ref = _reference_positions(panel.columns)
+    sizes = [min(chunk_size, replicates - start) for start in range(0, replicates, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(values, ref, s, n, block_length, method) for s, n in zip(seeds, sizes)]
+    if processes == 1 or len(args) == 1:
+        chunks = [_replicate_moments(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            chunks = list(pool.map(_replicate_moments, *zip(*args)))
+    return np.concatenate(chunks)
+
+
+def bootstrap_statistics_table(panel, alpha=0.05, **kwargs):
+    """
+    Business cycle statistics with block-bootstrap confidence intervals
+
+    Parameters:
+    panel (pd.DataFrame): Cycle panel with (country, variable) columns
+    alpha (float): 1 - confidence level
+    **kwargs: Passed on to bootstrap_moments
+
+    Returns:
+    pd.DataFrame: Table in the create_statistics_table layout with an extra
+        innermost column level: estimate, lower, upper
+    """
+    estimate = np.stack(_moments(panel.to_numpy(dtype=float),
+                                 _reference_positions(panel.columns)))
+    draws = bootstrap_moments(panel, **kwargs)
+    lower, upper = np.nanquantile(draws, [alpha / 2, 1 - alpha / 2], axis=0)
+    parts = {}
+    for name, values in [('estimate', estimate), ('lower', lower), ('upper', upper)]:
+        moments = pd.DataFrame(values.T, index=panel.columns, columns=STATS)
+        parts[name] = statistics_table(moments)
+    table = pd.concat(parts, axis=1).reorder_levels([1, 2, 0], axis=1)
+    return table[[(stat, country, name) for stat, country in parts['estimate'].columns
+                  for name in parts]]
+
+
+def compare_countries_bootstrap(panel, country1, country2, alpha=0.05, **kwargs):
+    """
+    Bootstrap test of cross-country differences in business cycle moments
+
+    For each variable and statistic the difference country1 - country2 is
+    reported with a percentile confidence interval and a two-sided p-value
+    for a zero difference (from the bootstrap distribution centred at the
+    estimate).
+
+    Parameters:
+    panel (pd.DataFrame): Cycle panel with (country, variable) columns
+    country1, country2: Country labels to compare
+    alpha (float): 1 - confidence level
+    **kwargs: Passed on to bootstrap_moments
+
+    Returns:
+    pd.DataFrame: Indexed by (variable, statistic), columns difference,
+        lower, upper and p_value
+    """
+    variables = [var for var in panel[country1].columns if var in panel[country2].columns]
+    cols1 = panel.columns.get_indexer([(country1, var) for var in variables])
+    cols2 = panel.columns.get_indexer([(country2, var) for var in variables])
+    estimate = np.stack(_moments(panel.to_numpy(dtype=float),
+                                 _reference_positions(panel.columns)))
+    diff = estimate[:, cols1] - estimate[:, cols2]
+    draws = bootstrap_moments(panel, **kwargs)
+    diff_draws = draws[:, :, cols1] - draws[:, :, cols2]
+    lower, upper = np.nanquantile(diff_draws, [alpha / 2, 1 - alpha / 2], axis=0)
+    p_value = np.nanmean(np.abs(diff_draws - diff) >= np.abs(diff), axis=0)
+    index = pd.MultiIndex.from_product([variables, STATS], names=['variable', 'statistic'])
+    return pd.DataFrame({'difference': diff.T.ravel(), 'lower': lower.T.ravel(),
+                         'upper': upper.T.ravel(), 'p_value': p_value.T.ravel()},
+                        index=index)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from panel import to_panel
+from moments import cycle_moments, statistics_table
+
+STATS = ['std_dev', 'autocorr', 'corr_with_gdp']
+
+
+def _as_panel(cycles):
+    """
+    Accept either a (country, variable) cycle panel or {country: {variable: cycle}}
+    """
+    return cycles if isinstance(cycles, pd.DataFrame) else to_panel(cycles)
+
+
+def build_statistics_table(stats_by_country):
+    """
+    Business cycle statistics table for any number of countries
+
+    Parameters:
+    stats_by_country (dict): {country: stats}, where stats is either the
+        (std_dev, autocorr, corr_with_gdp) tuple of Series returned by
+        calculate_statistics or a DataFrame with those columns
+
+    Returns:
+    pd.DataFrame: Variables in rows, (statistic, country) columns
+    """
+    moments = {}
+    for country, stats in stats_by_country.items():
+        if not isinstance(stats, pd.DataFrame):
+            stats = pd.concat(dict(zip(STATS, stats)), axis=1)
+        moments[country] = stats[STATS]
+    return statistics_table(pd.concat(moments, names=['country', 'variable']))
+
+
+def country_statistics_table(cycles, lag=1):
+    """
+    Volatility, persistence and GDP correlation for N countries in one pass
+
+    Parameters:
+    cycles: {country: {variable: cycle}} or a (country, variable) panel
+    lag (int): Autocorrelation order for the persistence column
+
+    Returns:
+    pd.DataFrame: Variables in rows, (statistic, country) columns
+    """
+    return statistics_table(cycle_moments(_as_panel(cycles), lag=lag))
+
+
+def cross_country_correlations(cycles):
+    """
+    Pairwise cross-country correlation matrix of every variable's cycle
+
+    Each correlation uses the periods where both countries are observed (as
+    an inner join of the two series would), but all pairs and all variables
+    come out of one batched matrix product on the aligned panel rather than
+    one concat/corr per pair.
+
+    Parameters:
+    cycles: {country: {variable: cycle}} or a (country, variable) panel
+
+    Returns:
+    pd.DataFrame: (variable, country) rows and country columns
+    """
+    panel = _as_panel(cycles)
+    countries = list(dict.fromkeys(panel.columns.get_level_values(0)))
+    variables = list(dict.fromkeys(panel.columns.get_level_values(1)))
+    full = pd.MultiIndex.from_product([variables, countries])
+    values = panel.swaplevel(axis=1).reindex(columns=full).to_numpy(dtype=float)
+    # (variables, periods, countries), centred so the sums lose less precision
+    values = values.reshape(len(values), len(variables), len(countries)).transpose(1, 0, 2)
+    values = values - np.nanmean(values, axis=1, keepdims=True)
+    valid = (~np.isnan(values)).astype(float)
+    x = np.where(valid > 0, values, 0.0)
+    xt = x.transpose(0, 2, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n = valid.transpose(0, 2, 1) @ valid
+        sx = xt @ valid
+        sxx = (xt ** 2) @ valid
+        sxy = xt @ x
+        cov = sxy - sx * sx.transpose(0, 2, 1) / n
+        var = sxx - sx ** 2 / n
+        corr = cov / np.sqrt(var * var.transpose(0, 2, 1))
+    index = pd.MultiIndex.from_product([variables, countries], names=['variable', 'country'])
+    return pd.DataFrame(corr.reshape(-1, len(countries)), index=index, columns=countries)
+
+
+def compare_cycles(cycles):
+    """
+    Cycle volatility of each country and cross-country correlations, by variable
+
+    Parameters:
+    cycles: {country: {variable: cycle}} or a (country, variable) panel
+
+    Returns:
+    pd.DataFrame: Indexed by variable, with 'std_<country> (%)' columns and
+        one 'corr_<country1>_<country2>' column per pair of countries
+    """
+    panel = _as_panel(cycles)
+    corr = cross_country_correlations(panel)
+    countries = list(corr.columns)
+    variables = list(dict.fromkeys(corr.index.get_level_values(0)))
+    full = pd.MultiIndex.from_product([countries, variables])
+    std = (panel.std() * 100).reindex(full).to_numpy().reshape(len(countries), -1).T
+    # upper triangle of each variable's country x country matrix, pairs in row order
+    i, j = np.triu_indices(len(countries), 1)
+    pairs = corr.to_numpy().reshape(len(variables), len(countries), len(countries))[:, i, j]
+    names = [c.lower() for c in countries]
+    columns = ([f"std_{c} (%)" for c in names]
+               + [f"corr_{names[a]}_{names[b]}" for a, b in zip(i, j)])
+    return pd.DataFrame(np.hstack([std, pairs]), index=pd.Index(variables, name='variable'),
+                        columns=columns)
@@ -1,134 +1,133 @@
 # 必要なライブラリのインポート
-import pandas as pd
 import matplotlib.pyplot as plt
-
-# データ取得関数（仮）
-def get_macro_data(country_code, start, end):
-    series_ids = {
-    'JP': {
-        'gdp': 'JPNRGDPEXP',
-        'consumption': 'JPNPFCEADSMEI',
-        'investment': 'JPNGFCFADSMEI',
-    },
-    'ES': {
-        'gdp': 'ESPNRGDPEXP',
-        'consumption': 'ESPPFCEADSMEI',
-        'investment': 'ESPGFCFADSMEI',
-    }
-}
-
-    # 必要に応じてAPIやデータ読み込み処理を書く
-    pass  # 仮置き
+from panel import process_panel_data, to_panel
+from moments import cycle_moments
+from cross_country import build_statistics_table, compare_cycles
+from plotting import (draw_trends_and_cycles, draw_cycle_comparison,
+                      trends_filename, comparison_filename)
+from fred_cache import get_many
+from memo import memoize
+from settings import SERIES_IDS, END_DATE
+from instrument import stage
+from rbc import model_statistics_table
+
+# データ取得関数（FREDからローカルキャッシュ経由で取得）
+def get_macro_data(country_code, start, end, offline=False, return_errors=False):
+    data, errors = get_many({country_code: SERIES_IDS[country_code]}, start, end, offline=offline)
+    data = data[country_code]
+    if return_errors:
+        return data, errors
+    return data
 
 # トレンド・循環成分の分解関数（HPフィルターなど想定）
-def process_cycle_data(data):
+@memoize(split_nested=True)
+def process_cycle_data(data, lamb=1600, method='hp', **params):
     # 'gdp', 'consumption', 'investment' を含む辞書で返す
-    pass  # 仮置き
+    # 国をキーにした入れ子の辞書を渡すと、全系列をまとめて一度に処理する
+    # method で HP 以外のフィルタ ('bk', 'cf', 'hamilton') も選べる
+    return process_panel_data(data, lamb=lamb, method=method, **params)
 
 # 統計計算関数
+@memoize()
 def calculate_statistics(cycle_data):
-    stats = {
-        'gdp': [cycle_data['gdp'].std() * 100, cycle_data['gdp'].autocorr(), cycle_data['gdp'].corr(cycle_data['gdp'])],
-        'consumption': [cycle_data['consumption'].std() * 100, cycle_data['consumption'].autocorr(), cycle_data['consumption'].corr(cycle_data['gdp'])],
-        'investment': [cycle_data['investment'].std() * 100, cycle_data['investment'].autocorr(), cycle_data['investment'].corr(cycle_data['gdp'])],
-    }
-    return (pd.DataFrame(stats).T
-            .rename(columns={0: 'std_dev', 1: 'autocorr', 2: 'corr_with_gdp'}))
+    # 全変数の標準偏差・自己相関・GDPとの相関を一括で計算
+    return cycle_moments(to_panel(cycle_data))
 
 # 比較表作成関数
 def create_statistics_table(sp_stats, jp_stats):
-    sp_std, sp_auto, sp_corr = sp_stats['std_dev'], sp_stats['autocorr'], sp_stats['corr_with_gdp']
-    jp_std, jp_auto, jp_corr = jp_stats['std_dev'], jp_stats['autocorr'], jp_stats['corr_with_gdp']
-
-    stats_data = {
-        ('Volatility (%)', 'Spain'): sp_std,
-        ('Volatility (%)', 'Japan'): jp_std,
-        ('Persistence', 'Spain'): sp_auto,
-        ('Persistence', 'Japan'): jp_auto,
-        ('Corr. with GDP', 'Spain'): sp_corr,
-        ('Corr. with GDP', 'Japan'): jp_corr
-    }
-    columns = pd.MultiIndex.from_tuples(stats_data.keys())
-    stats_df = pd.DataFrame(stats_data, index=['gdp', 'consumption', 'investment'])
-    return stats_df
+    return build_statistics_table({'Spain': sp_stats, 'Japan': jp_stats})
+
+# RBCモデルのシミュレーション・モーメントとの比較表
+def create_model_table(sp_stats, jp_stats, nobs):
+    # データと同じ長さの経路を多数シミュレーションし、同じHPフィルタ・統計量で比較
+    return model_statistics_table({'Spain': sp_stats, 'Japan': jp_stats}, nobs=nobs)
 
 # 循環成分の標準偏差・相関の比較
 def compare_cycle_statistics(sp_cycles, jp_cycles):
-    vars = set(sp_cycles.keys()) & set(jp_cycles.keys())
-    rows = []
-    for var in vars:
-        sp = sp_cycles[var].dropna()
-        jp = jp_cycles[var].dropna()
-        df = pd.concat([sp, jp], axis=1, join='inner')
-        rows.append({
-            'variable': var,
-            'std_spain (%)': sp.std() * 100,
-            'std_japan (%)': jp.std() * 100,
-            'corr_spain_japan': df.iloc[:, 0].corr(df.iloc[:, 1])
-        })
-    return pd.DataFrame(rows).set_index('variable')
+    # 両国が観測されている期間で相関を計算（N か国版は cross_country.compare_cycles）
+    return compare_cycles({'Spain': sp_cycles, 'Japan': jp_cycles})
 
 # 循環成分プロット関数
+@memoize('plot', outputs=lambda c1, cycles1, c2, *args: [comparison_filename(c1, c2)])
 def plot_cycle_comparison(country1, cycles1, country2, cycles2):
-    variables = ['gdp', 'consumption', 'investment']
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    for i, var in enumerate(variables):
-        ax = axes[i]
-        if var in cycles1 and var in cycles2:
-            cycles1[var].plot(ax=ax, label=country1, linewidth=1.5)
-            cycles2[var].plot(ax=ax, label=country2, linewidth=1.5)
-            ax.axhline(0, color='black', linestyle='-', alpha=0.3)
-            ax.set_title(f"{var.capitalize()} Cycle: {country1} vs {country2}")
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(f"{country1.lower()}_{country2.lower()}_cycle_comparison.png", dpi=300, bbox_inches='tight')
+    fig = plt.figure(figsize=(18, 5))
+    draw_cycle_comparison(fig, country1, cycles1, country2, cycles2)
+    plt.savefig(comparison_filename(country1, country2), dpi=300, bbox_inches='tight')
     plt.show()
 
-# トレンド＋循環の描画関数（仮）
+# トレンド＋循環の描画関数
+@memoize('plot', outputs=lambda country, *args: [trends_filename(country)])
 def plot_trends_and_cycles(country, raw_data, cycles, trends):
-    pass  # 実装済みを仮定
+    fig = plt.figure(figsize=(16, 12))
+    draw_trends_and_cycles(fig, country, raw_data, cycles, trends)
+    plt.savefig(trends_filename(country), dpi=300, bbox_inches='tight')
+    plt.show()
 
 # 分析実行関数
 def analyze_business_cycles_spain_japan():
-    print("Fetching Spain macroeconomic data...")
-    sp_data = get_macro_data('ES', start_date, end_date)
-    print("Spain data preview:", sp_data)
-
-    print("Fetching Japan macroeconomic data...")
-    jp_data = get_macro_data('JP', start_date, end_date)
-
-    print("Processing Spain data...")
-    sp_cycles, sp_trends = process_cycle_data(sp_data)
-
-    print("Processing Japan data...")
-    jp_cycles, jp_trends = process_cycle_data(jp_data)
-
-    print("Calculating statistics...")
-    sp_stats = calculate_statistics(sp_cycles)
-    jp_stats = calculate_statistics(jp_cycles)
-
-    print("Creating comparison table...")
-    stats_table = create_statistics_table(sp_stats, jp_stats)
-    print("\nBusiness Cycle Statistics:\n")
-    print(stats_table.round(3))
-
-    print("Plotting trends and cycles for Spain...")
-    plot_trends_and_cycles("Spain", sp_data, sp_cycles, sp_trends)
-
-    print("Plotting trends and cycles for Japan...")
-    plot_trends_and_cycles("Japan", jp_data, jp_cycles, jp_trends)
-
-    print("\nSpain vs Japan: Cycle Comparison Table")
-    comp_df = compare_cycle_statistics(sp_cycles, jp_cycles)
-    print(comp_df.round(3))
-
-    print("\nPlotting Spain vs Japan cycle comparison...")
-    plot_cycle_comparison("Spain", sp_cycles, "Japan", jp_cycles)
+    # 各段階の時間・メモリは instrument.enable(...) で有効にしたシンクに送られる
+    with stage('analyze_business_cycles_spain_japan'):
+        print("Fetching Spain macroeconomic data...")
+        with stage('fetch', country='ES') as st:
+            sp_data = st.count(get_macro_data('ES', start_date, end_date))
+        print("Spain data preview:", sp_data)
+
+        print("Fetching Japan macroeconomic data...")
+        with stage('fetch', country='JP') as st:
+            jp_data = st.count(get_macro_data('JP', start_date, end_date))
+
+        print("Processing Spain and Japan data...")
+        with stage('filter', country='ES,JP') as st:
+            cycles, trends = process_cycle_data({'ES': sp_data, 'JP': jp_data})
+            st.count(cycles)
+        sp_cycles, sp_trends = cycles.get('ES', {}), trends.get('ES', {})
+        jp_cycles, jp_trends = cycles.get('JP', {}), trends.get('JP', {})
+
+        print("Calculating statistics...")
+        with stage('statistics', country='ES') as st:
+            sp_stats = calculate_statistics(st.count(sp_cycles))
+        with stage('statistics', country='JP') as st:
+            jp_stats = calculate_statistics(st.count(jp_cycles))
+
+        print("Creating comparison table...")
+        with stage('table') as st:
+            st.count([sp_cycles, jp_cycles])
+            stats_table = create_statistics_table(sp_stats, jp_stats)
+        print("\nBusiness Cycle Statistics:\n")
+        print(stats_table.round(3))
+
+        # シミュレーションの長さは取得できた系列の観測期間全体（スペインのGDPが欠けても可）
+        nobs = len(to_panel(cycles))
+        if nobs:
+            print("Simulating the RBC model...")
+            with stage('model') as st:
+                st.count([sp_cycles, jp_cycles])
+                model_table = create_model_table(sp_stats, jp_stats, nobs=nobs)
+            print("\nData vs RBC Model:\n")
+            print(model_table.round(3))
+
+        print("Plotting trends and cycles for Spain...")
+        with stage('plot', country='ES') as st:
+            plot_trends_and_cycles("Spain", st.count(sp_data), sp_cycles, sp_trends)
+
+        print("Plotting trends and cycles for Japan...")
+        with stage('plot', country='JP') as st:
+            plot_trends_and_cycles("Japan", st.count(jp_data), jp_cycles, jp_trends)
+
+        print("\nSpain vs Japan: Cycle Comparison Table")
+        with stage('compare') as st:
+            comp_df = compare_cycle_statistics(sp_cycles, jp_cycles)
+            st.count([sp_cycles, jp_cycles])
+        print(comp_df.round(3))
+
+        print("\nPlotting Spain vs Japan cycle comparison...")
+        with stage('plot', country='ES-JP') as st:
+            st.count([sp_cycles, jp_cycles])
+            plot_cycle_comparison("Spain", sp_cycles, "Japan", jp_cycles)
 
 # 日付の指定（適宜設定）
 start_date = '1995-01-01'
-end_date = '2025-01-01'
+end_date = END_DATE
 
 # スクリプトが直接実行されたときのみ分析を実行
 if __name__ == "__main__":
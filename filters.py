@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import fftconvolve
+from hp_filter import _hp_trend, _valid_spans, hpfilter_panel
+
+
+def hp(x, lamb=1600):
+    """
+    Hodrick-Prescott filter (banded solve, see hp_filter)
+    """
+    trend = _hp_trend(x, lamb)
+    return x - trend, trend
+
+
+def baxter_king(x, low=6, high=32, K=12):
+    """
+    Baxter-King band-pass filter, applied by FFT convolution
+
+    Matches statsmodels bkfilter; the K periods lost at each end are NaN.
+    """
+    omega_1 = 2. * np.pi / high
+    omega_2 = 2. * np.pi / low
+    j = np.arange(1, K + 1)
+    weights = (np.sin(omega_2 * j) - np.sin(omega_1 * j)) / (np.pi * j)
+    bweights = np.r_[weights[::-1], (omega_2 - omega_1) / np.pi, weights]
+    bweights -= bweights.mean()
+    cycle = np.full_like(x, np.nan)
+    if len(x) > 2 * K:
+        cycle[K:len(x) - K] = fftconvolve(x, bweights[:, None], mode='valid', axes=0)
+    return cycle, x - cycle
+
+
+def christiano_fitzgerald(x, low=6, high=32, drift=True):
+    """
+    Christiano-Fitzgerald asymmetric band-pass filter (random walk version)
+
+    Matches statsmodels cffilter. The interior weights are the same ideal
+    band-pass weights for every date, so they are applied as one FFT
+    convolution; only the end-point corrections differ by date and are added
+    from cumulative sums of the weights.
+    """
+    nobs = len(x)
+    a = 2 * np.pi / high
+    b = 2 * np.pi / low
+    if drift:
+        x = x - np.arange(nobs)[:, None] * (x[-1] - x[0]) / (nobs - 1)
+    J = np.arange(1, nobs + 1)
+    Bj = np.r_[(b - a) / np.pi, (np.sin(b * J) - np.sin(a * J)) / (np.pi * J)]
+    cumB = np.r_[0.0, np.cumsum(Bj[1:])]
+
+    interior = x.copy()
+    interior[[0, -1]] = 0.0
+    kernel = Bj[np.abs(np.arange(-(nobs - 1), nobs))]
+    cycle = fftconvolve(interior, kernel[:, None], mode='full', axes=0)[nobs - 1:2 * nobs - 1]
+
+    i = np.arange(nobs)
+    forward = cumB[np.maximum(nobs - i - 2, 0)]
+    backward = cumB[np.maximum(i - 1, 0)]
+    B = -0.5 * Bj[0] - forward
+    A = -Bj[0] - forward - backward - B
+    cycle += B[:, None] * x[-1] + A[:, None] * x[0]
+    cycle[[0, -1]] += Bj[0] * x[[0, -1]]
+    return cycle, x - cycle
+
+
+def hamilton(x, h=8, p=4):
+    """
+    Hamilton (2018) regression filter: the cycle is the residual of y_{t+h}
+    on a constant and y_t, ..., y_{t-p+1}
+
+    The regressions of all columns are solved together with one batched QR
+    least-squares solve. The first p + h - 1 periods are NaN.
+    """
+    nobs, nseries = x.shape
+    cycle = np.full_like(x, np.nan)
+    start = p + h - 1
+    if nobs <= start + p:
+        return cycle, x - cycle
+    target = x[start:].T
+    lags = np.stack([x[p - 1 - k:nobs - h - k] for k in range(p)], axis=-1)
+    design = np.concatenate([np.ones((nseries, nobs - start, 1)),
+                             lags.transpose(1, 0, 2)], axis=-1)
+    q, r = np.linalg.qr(design)
+    beta = np.linalg.solve(r, np.einsum('smk,sm->sk', q, target)[..., None])
+    fitted = (design @ beta)[..., 0]
+    cycle[start:] = (target - fitted).T
+    return cycle, x - cycle
+
+
+FILTERS = {
+    'hp': hp,
+    'bk': baxter_king,
+    'cf': christiano_fitzgerald,
+    'hamilton': hamilton,
+}
+
+
+def filter_panel(panel, method='hp', **params):
+    """
+    Decompose every column of a wide panel with the chosen filter
+
+    Columns may have different start and end dates; columns sharing a sample
+    length are filtered together as one 2-D block. Only the HP filter
+    accepts gaps inside a sample (see hpfilter_panel).
+
+    Parameters:
+    panel (pd.DataFrame or ndarray): (nobs, nseries) panel of log series
+    method (str): 'hp', 'bk' (Baxter-King), 'cf' (Christiano-Fitzgerald)
+        or 'hamilton'
+    **params: Filter parameters (lamb for 'hp'; low, high, K for 'bk';
+        low, high, drift for 'cf'; h, p for 'hamilton')
+
+    Returns:
+    tuple: (cycle, trend) panels shaped like the input, NaN where the
+        filter gives no estimate
+    """
+    if method not in FILTERS:
+        raise ValueError(f"Unknown filter {method!r}; choose from {sorted(FILTERS)}")
+    if method == 'hp':
+        return hpfilter_panel(panel, **params)
+    func = FILTERS[method]
+    values = np.asarray(panel, dtype=float)
+    starts, ends = _valid_spans(values)
+    lengths = ends - starts
+    cycle = np.full_like(values, np.nan)
+    trend = np.full_like(values, np.nan)
+    for nobs in np.unique(lengths[lengths > 0]):
+        cols = np.flatnonzero(lengths == nobs)
+        rows = starts[cols] + np.arange(nobs)[:, None]
+        cycle[rows, cols], trend[rows, cols] = func(values[rows, cols], **params)
+    if isinstance(panel, pd.DataFrame):
+        return (pd.DataFrame(cycle, index=panel.index, columns=panel.columns),
+                pd.DataFrame(trend, index=panel.index, columns=panel.columns))
+    return cycle, trend
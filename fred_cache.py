@@ -0,0 +1,164 @@
+import os
+import glob
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from functools import partial
+from fred_fetch import fetch_fred_csv, fetch_many
+from series_store import load_series
+
+CACHE_DIR = os.environ.get('MACRO_CACHE_DIR', os.path.join('.macro_cache', 'fred'))
+LOCAL_DIRS = ('.',)
+
+
+def _cache_path(series_id, cache_dir):
+    return os.path.join(cache_dir, f"{series_id}.npz")
+
+
+def _read_entry(path):
+    """
+    Load a cached series and the date range it was fetched for, or None
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        dates = pd.DatetimeIndex(f['dates'].view('datetime64[ns]'))
+        entry = {'values': pd.Series(f['values'], index=dates),
+                 'start': pd.Timestamp(int(f['start'])),
+                 'end': pd.Timestamp(int(f['end'])),
+                 'fetched_at': float(f['fetched_at'])}
+    return entry
+
+
+def _write_entry(path, values, start, end):
+    """
+    Store a series as raw date and value arrays (written atomically)
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # a unique temporary file, so concurrent writers of one entry never share it
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f,
+                     dates=values.index.values.astype('datetime64[ns]').view('int64'),
+                     values=values.to_numpy(dtype=float),
+                     start=np.int64(start.value), end=np.int64(end.value),
+                     fetched_at=np.float64(time.time()))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _to_frame(values, series_id, start, end):
+    """
+    Slice a cached series to [start, end] in pandas_datareader's layout
+    """
+    frame = values.loc[start:end].to_frame(series_id)
+    frame.index.name = 'DATE'
+    return frame
+
+
+def read_local_csv(series_id, local_dirs=LOCAL_DIRS):
+    """
+    Find a FRED-style CSV download (date column plus a column named after
+    the series) in the given directories
+
+    Returns:
+    pd.Series: The series, or None if no local file has it
+    """
+    for directory in local_dirs:
+        for path in sorted(glob.glob(os.path.join(directory, '*.csv'))):
+            with open(path) as f:
+                header = f.readline().strip().split(',')
+            if series_id in header[1:]:
+                return load_series(path, column=series_id)
+    return None
+
+
+def get_series(series_id, start, end, cache_dir=None, ttl=None, incremental=True,
+               offline=False, fetch=None, local_dirs=LOCAL_DIRS):
+    """
+    Fetch a FRED series through the on-disk cache
+
+    Each series is cached once, together with the date range it was fetched
+    for. Requests inside that range are served from disk; a request that runs
+    past the cached end (or a refresh after the TTL expired) only downloads
+    the tail from the last cached observation onward when incremental is True.
+
+    Parameters:
+    series_id (str): FRED series ID, e.g. 'JPNRGDPEXP'
+    start, end (str or datetime): Date range
+    cache_dir (str): Cache directory (default: CACHE_DIR)
+    ttl (float): Seconds before a cached series is refreshed (None: never)
+    incremental (bool): Refresh by fetching only the missing tail
+    offline (bool): Never touch the network; serve from the cache or from a
+        local CSV download, and raise LookupError if neither has the series
+    fetch (callable): fetch(series_id, start, end) -> DataFrame, the network
+        source (default: fetch_fred_csv); tests can pass a local stand-in
+    local_dirs (tuple): Directories searched for CSV downloads when offline
+
+    Returns:
+    pd.DataFrame: Single column named series_id, indexed by DATE
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    path = _cache_path(series_id, cache_dir or CACHE_DIR)
+    entry = _read_entry(path)
+    covered = entry is not None and entry['start'] <= start and end <= entry['end']
+
+    if offline:
+        if covered:
+            return _to_frame(entry['values'], series_id, start, end)
+        local = read_local_csv(series_id, local_dirs)
+        if local is None:
+            raise LookupError(f"{series_id} for {start.date()}..{end.date()} "
+                              "is not in the cache or a local CSV (offline mode)")
+        return _to_frame(local, series_id, start, end)
+
+    fresh = entry is not None and (ttl is None or time.time() - entry['fetched_at'] < ttl)
+    if covered and fresh:
+        return _to_frame(entry['values'], series_id, start, end)
+
+    fetch = fetch or fetch_fred_csv
+    if entry is not None and incremental and entry['start'] <= start and len(entry['values']):
+        # Only the tail is missing or stale: refetch from the last observation
+        fetch_start, fetch_end = entry['values'].index[-1], max(end, entry['end'])
+    else:
+        fetch_start, fetch_end = start, end
+    values = fetch(series_id, fetch_start, fetch_end).squeeze(axis=1).astype(float)
+    values.index = pd.DatetimeIndex(values.index)
+
+    if entry is not None and fetch_start <= entry['end'] and entry['start'] <= fetch_end:
+        values = values.combine_first(entry['values'])
+        fetch_start = min(fetch_start, entry['start'])
+        fetch_end = max(fetch_end, entry['end'])
+    _write_entry(path, values, fetch_start, fetch_end)
+    return _to_frame(values, series_id, start, end)
+
+
+def get_many(series_table, start, end, max_workers=8, **kwargs):
+    """
+    Fetch a whole table of series concurrently through the cache
+
+    Parameters:
+    series_table (dict): {country: {variable: series_id}}
+    start, end (str or datetime): Date range
+    max_workers (int): Maximum number of concurrent requests
+    **kwargs: Passed on to get_series (offline, ttl, fetch, ...)
+
+    Returns:
+    dict: {country: {variable: DataFrame}} for the series that were fetched
+    list: FetchError records (key is the (country, variable) pair)
+    """
+    series_ids = {(country, var): series_id
+                  for country, table in series_table.items()
+                  for var, series_id in table.items()}
+    results, errors = fetch_many(series_ids, start, end, max_workers=max_workers,
+                                 fetch=partial(get_series, **kwargs))
+    data = {country: {} for country in series_table}
+    for (country, var), df in results.items():
+        data[country][var] = df
+    return data, errors
@@ -0,0 +1,138 @@
+import io
+import os
+import time
+import random
+import threading
+import http.client
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlencode
+import pandas as pd
+
+FRED_URL = os.environ.get('FRED_URL', 'https://fred.stlouisfed.org/graph/fredgraph.csv')
+
+# One failed series in a fetch_many call
+FetchError = namedtuple('FetchError', ['key', 'series_id', 'attempts', 'error'])
+
+_local = threading.local()
+
+
+class RetryableError(OSError):
+    """
+    Transient failure (rate limit, server error) worth retrying
+    """
+
+
+def _connection(scheme, netloc, timeout):
+    """
+    Keep-alive connection to a host, reused by every request on this thread
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        conn = connections[(scheme, netloc)] = cls(netloc, timeout=timeout)
+    return conn
+
+
+def _drop_connection(scheme, netloc):
+    conn = getattr(_local, 'connections', {}).pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def fetch_fred_csv(series_id, start, end, base_url=None, timeout=30):
+    """
+    Download one series from FRED's CSV endpoint over a reused connection
+
+    Parameters:
+    series_id (str): FRED series ID
+    start, end (str or datetime): Date range
+    base_url (str): CSV endpoint (default: FRED_URL; a local mock in tests)
+    timeout (float): Socket timeout in seconds
+
+    Returns:
+    pd.DataFrame: Single column named series_id, indexed by DATE
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    url = urlsplit(base_url or FRED_URL)
+    query = urlencode({'id': series_id, 'cosd': start.strftime('%Y-%m-%d'),
+                       'coed': end.strftime('%Y-%m-%d')})
+    conn = _connection(url.scheme, url.netloc, timeout)
+    try:
+        conn.request('GET', f"{url.path}?{query}")
+        response = conn.getresponse()
+        body = response.read()
+    except (OSError, http.client.HTTPException):
+        _drop_connection(url.scheme, url.netloc)
+        raise
+    if response.status == 429 or response.status >= 500:
+        raise RetryableError(f"HTTP {response.status} for {series_id}")
+    if response.status != 200:
+        raise OSError(f"HTTP {response.status} for {series_id}")
+    data = pd.read_csv(io.BytesIO(body), index_col=0, parse_dates=True, header=None,
+                       skiprows=1, names=['DATE', series_id], na_values='.')
+    return data.loc[start:end]
+
+
+def _fetch_with_retry(fetch, key, series_id, start, end, retries, backoff):
+    """
+    Run one fetch, retrying transient failures with exponential backoff
+
+    Returns:
+    tuple: (key, DataFrame or None, FetchError or None)
+    """
+    for attempt in range(1, retries + 2):
+        try:
+            return key, fetch(series_id, start, end), None
+        except (RetryableError, ConnectionError, TimeoutError, http.client.HTTPException) as e:
+            if attempt > retries:
+                return key, None, FetchError(key, series_id, attempt, repr(e))
+            time.sleep(backoff * 2 ** (attempt - 1) * (1 + random.random()))
+        except Exception as e:
+            return key, None, FetchError(key, series_id, attempt, repr(e))
+
+
+def fetch_many(series_ids, start, end, fetch=None, max_workers=8, retries=3, backoff=0.5):
+    """
+    Fetch many series concurrently
+
+    At most max_workers requests are in flight; each worker thread keeps its
+    own keep-alive connection, and a series ID listed under several keys is
+    fetched once. Rate limits, server errors and dropped
+    connections are retried with exponential backoff; any other error fails
+    that series only.
+
+    Parameters:
+    series_ids (dict): {key: series_id}, where key is any label such as
+        a variable name or a (country, variable) pair
+    start, end (str or datetime): Date range
+    fetch (callable): fetch(series_id, start, end) -> DataFrame
+        (default: fetch_fred_csv)
+    max_workers (int): Maximum number of concurrent requests
+    retries (int): Retries per series after the first attempt
+    backoff (float): Base delay in seconds, doubled on each retry
+
+    Returns:
+    dict: {key: DataFrame} for the series that were fetched
+    list: FetchError records for the series that failed
+    """
+    fetch = fetch or fetch_fred_csv
+    results, errors = {}, []
+    if not series_ids:
+        return results, errors
+    # a series listed under several keys is requested once
+    unique = list(dict.fromkeys(series_ids.values()))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+        futures = {series_id: pool.submit(_fetch_with_retry, fetch, series_id, series_id,
+                                          start, end, retries, backoff)
+                   for series_id in unique}
+        for key, series_id in series_ids.items():
+            _, data, error = futures[series_id].result()
+            if error is None:
+                results[key] = data
+            else:
+                errors.append(error._replace(key=key))
+    return results, errors
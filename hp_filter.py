@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from scipy.linalg import cholesky_banded, cho_solve_banded, solveh_banded
+
+
+def _penalty_band(nobs):
+    """
+    K'K in upper banded storage, (3, nobs), where K is the (nobs-2) x nobs
+    second-difference operator
+    """
+    ab = np.zeros((3, nobs))
+    # Main diagonal of K'K: 1, 5, 6, ..., 6, 5, 1
+    ab[2, :nobs - 2] += 1.0
+    ab[2, 1:nobs - 1] += 4.0
+    ab[2, 2:] += 1.0
+    # First superdiagonal: -2, -4, ..., -4, -2
+    ab[1, 1:nobs - 1] -= 2.0
+    ab[1, 2:] -= 2.0
+    # Second superdiagonal: 1, ..., 1
+    ab[0, 2:] = 1.0
+    return ab
+
+
+@lru_cache(maxsize=32)
+def _hp_factor(nobs, lamb):
+    """
+    Banded Cholesky factor of the HP system matrix I + lamb * K'K
+
+    K is the (nobs-2) x nobs second-difference operator, so the system is
+    pentadiagonal. Only its three upper diagonals are stored, which keeps
+    the factorization O(nobs) in both time and memory.
+
+    Parameters:
+    nobs (int): Sample length (at least 3)
+    lamb (float): HP smoothing parameter
+
+    Returns:
+    ndarray: (3, nobs) upper banded Cholesky factor
+    """
+    ab = lamb * _penalty_band(nobs)
+    ab[2] += 1.0
+    return cholesky_banded(ab, lower=False)
+
+
+def _hp_trend(x, lamb):
+    """
+    Solve (I + lamb * K'K) trend = x along the first axis of x
+    """
+    nobs = x.shape[0]
+    if nobs < 3:
+        # No second differences to penalize: the trend is the data itself
+        return x.copy()
+    return cho_solve_banded((_hp_factor(nobs, float(lamb)), False), x)
+
+
+def _weighted_trend(values, lamb):
+    """
+    HP trend of columns with missing values inside their sample
+
+    Minimizes the HP objective over the observed periods only, i.e. solves
+    (W + lamb * K'K) trend = W y with W = diag(observed) on each column's
+    span. The system stays pentadiagonal, so each column costs one O(nobs)
+    banded Cholesky solve; the trend is interpolated through the gaps and
+    NaN outside the span.
+    """
+    trend = np.full_like(values, np.nan)
+    for j in range(values.shape[1]):
+        observed = ~np.isnan(values[:, j])
+        rows = np.flatnonzero(observed)
+        if len(rows) == 0:
+            continue
+        lo, hi = rows[0], rows[-1] + 1
+        if hi - lo < 3:
+            trend[lo:hi, j] = values[lo:hi, j]
+            continue
+        weights = observed[lo:hi].astype(float)
+        ab = lamb * _penalty_band(hi - lo)
+        ab[2] += weights
+        trend[lo:hi, j] = solveh_banded(ab, np.where(weights > 0, values[lo:hi, j], 0.0))
+    return trend
+
+
+def hpfilter(x, lamb=1600):
+    """
+    Hodrick-Prescott filter solved as a banded linear system
+
+    Drop-in replacement for statsmodels.tsa.filters.hpfilter: same inputs,
+    same (cycle, trend) output and naming, but the pentadiagonal system is
+    factorized with a banded Cholesky decomposition, so time and memory are
+    linear in the sample length.
+
+    Parameters:
+    x (array_like or pd.Series): Series to filter (typically in logs)
+    lamb (float): Smoothing parameter (1600 for quarterly data)
+
+    Returns:
+    tuple: (cycle, trend), as Series when x is a Series
+    """
+    values = np.asarray(x, dtype=float)
+    if values.ndim != 1:
+        raise ValueError("hpfilter expects a one-dimensional series")
+    if np.isnan(values).any():
+        raise ValueError("hpfilter does not accept missing values")
+    trend = _hp_trend(values, lamb)
+    cycle = values - trend
+    if isinstance(x, pd.Series):
+        name = x.name
+        cycle_name = 'cycle' if name is None else f"{name}_cycle"
+        trend_name = 'trend' if name is None else f"{name}_trend"
+        return (pd.Series(cycle, index=x.index, name=cycle_name),
+                pd.Series(trend, index=x.index, name=trend_name))
+    return cycle, trend
+
+
+def _spans(values):
+    """
+    First and one-past-last valid row of every column of a 2-D array, and
+    whether the column has missing values inside that span
+    """
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    nrows = values.shape[0]
+    starts = np.where(has_data, valid.argmax(axis=0), 0)
+    ends = np.where(has_data, nrows - valid[::-1].argmax(axis=0), 0)
+    gaps = valid.sum(axis=0) != ends - starts
+    return starts, ends, gaps
+
+
+def _valid_spans(values):
+    """
+    First and one-past-last valid row of every column of a 2-D array
+
+    Raises ValueError if a column has missing values inside its span.
+    """
+    starts, ends, gaps = _spans(values)
+    if gaps.any():
+        raise ValueError(f"Columns {np.flatnonzero(gaps).tolist()} have "
+                         "missing values inside their sample")
+    return starts, ends
+
+
+def hpfilter_panel(panel, lamb=1600):
+    """
+    HP filter every column of a wide panel with shared factorizations
+
+    Columns may start and end at different dates (leading and trailing NaN).
+    Columns are grouped by sample length, and each group is solved as a
+    single 2-D right-hand side against one banded factorization, so a panel
+    of many countries and variables costs one factorization per distinct
+    sample length. NaN inside a column's sample are missing observations of
+    that series; such columns get the HP trend of their observed periods
+    from one weighted banded solve each (_weighted_trend). Series on
+    different date grids should not be aligned on the union of their dates
+    first (that turns each grid's absent dates into gaps):
+    panel.process_panel_data filters each series on its own dates.
+
+    Parameters:
+    panel (pd.DataFrame or ndarray): (nobs, nseries) panel of log series
+    lamb (float): Smoothing parameter (1600 for quarterly data)
+
+    Returns:
+    tuple: (cycle, trend) panels with the same shape, index and columns
+        as the input, NaN outside each column's sample (the trend is
+        interpolated through internal gaps)
+    """
+    values = np.asarray(panel, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("hpfilter_panel expects a two-dimensional panel")
+    starts, ends, gaps = _spans(values)
+    lengths = np.where(gaps, 0, ends - starts)
+    trend = np.full_like(values, np.nan)
+    if gaps.any():
+        trend[:, gaps] = _weighted_trend(values[:, gaps], lamb)
+    for nobs in np.unique(lengths[lengths > 0]):
+        cols = np.flatnonzero(lengths == nobs)
+        rows = starts[cols] + np.arange(nobs)[:, None]
+        trend[rows, cols] = _hp_trend(values[rows, cols], lamb)
+    cycle = values - trend
+    if isinstance(panel, pd.DataFrame):
+        return (pd.DataFrame(cycle, index=panel.index, columns=panel.columns),
+                pd.DataFrame(trend, index=panel.index, columns=panel.columns))
+    return cycle, trend
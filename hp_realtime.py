@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# State-space form of the HP trend: trend_t = 2 trend_{t-1} - trend_{t-2} + e_t,
+# y_t = trend_t + cycle_t, with var(cycle) = 1 and var(e) = 1 / lamb.
+# The state is (trend_t, trend_{t-1}).
+_T = np.array([[2.0, -1.0], [1.0, 0.0]])
+
+
+def _init_state(nseries):
+    """
+    Augmented Kalman filter state for a bank of series
+
+    The initial state of each series (its first two trend values) is diffuse.
+    It is carried as an unknown vector d: the state mean is a + A d with
+    covariance P, and S, s accumulate the GLS normal equations for d, so the
+    filter reproduces the exact HP solution without an approximate prior.
+    """
+    return {'a': np.zeros((nseries, 2)),
+            'A': np.tile(np.eye(2), (nseries, 1, 1)),
+            'P': np.zeros((nseries, 2, 2)),
+            'S': np.zeros((nseries, 2, 2)),
+            's': np.zeros((nseries, 2)),
+            'nobs': np.zeros(nseries, dtype=int)}
+
+
+def _update(state, y):
+    """
+    Measurement update for the series with an observation in y (NaN: missing)
+    """
+    a, A, P = state['a'], state['A'], state['P']
+    obs = ~np.isnan(y)
+    F = P[:, 0, 0] + 1.0
+    K = np.where(obs[:, None], P[:, :, 0] / F[:, None], 0.0)
+    v = np.where(obs, y - a[:, 0], 0.0)
+    X = np.where(obs[:, None], A[:, 0, :], 0.0)
+    a += K * v[:, None]
+    A -= K[:, :, None] * X[:, None, :]
+    P -= K[:, :, None] * K[:, None, :] * F[:, None, None]
+    state['S'] += X[:, :, None] * X[:, None, :] / F[:, None, None]
+    state['s'] += X * (v / F)[:, None]
+    state['nobs'] += obs
+
+
+def _predict(state, q):
+    """
+    Time update for every series that has started (at least one observation)
+    """
+    started = state['nobs'] > 0
+    a, A, P = state['a'], state['A'], state['P']
+    a[started] = a[started] @ _T.T
+    A[started] = _T @ A[started]
+    P[started] = _T @ P[started] @ _T.T
+    P[started, 0, 0] += q
+
+
+def _diffuse_estimate(state):
+    """
+    GLS estimate of the diffuse initial state given the data so far
+    """
+    return np.einsum('kij,kj->ki', np.linalg.pinv(state['S']), state['s'])
+
+
+class RealtimeHP:
+    """
+    Incremental HP filter for a bank of series observed in real time
+
+    Each call to update() adds one period for every series at O(1) cost per
+    series, and returns the end-of-sample HP trend. That estimate is exactly
+    what a two-sided hpfilter run on all the data so far would give for the
+    last period, so the sequence of updates is the full vintage history of
+    end-of-sample estimates (the one-sided HP filter). Series may start late
+    (NaN until their first observation) and may have missing periods.
+
+    Parameters:
+    columns (int or list): Number of series, or their labels
+    lamb (float): Smoothing parameter (1600 for quarterly data)
+    """
+
+    def __init__(self, columns, lamb=1600):
+        self.columns = list(range(columns)) if isinstance(columns, int) else list(columns)
+        self.lamb = lamb
+        self._state = _init_state(len(self.columns))
+        self._dates = []
+        self._trends = []
+
+    def update(self, y, date=None):
+        """
+        Add one new observation per series
+
+        Parameters:
+        y (array_like): New values, one per series (NaN if not observed)
+        date: Label for this period in the vintage history
+
+        Returns:
+        tuple: (cycle, trend) end-of-sample estimates for this period
+        """
+        y = np.asarray(y, dtype=float).reshape(len(self.columns))
+        state = self._state
+        _update(state, y)
+        d = _diffuse_estimate(state)
+        trend = state['a'][:, 0] + np.einsum('kj,kj->k', state['A'][:, 0, :], d)
+        trend[state['nobs'] == 0] = np.nan
+        _predict(state, 1.0 / self.lamb)
+        self._dates.append(len(self._dates) if date is None else date)
+        self._trends.append(trend)
+        return y - trend, trend
+
+    def history(self):
+        """
+        Vintage history of end-of-sample trend estimates (one row per update)
+        """
+        return pd.DataFrame(np.array(self._trends).reshape(-1, len(self.columns)),
+                            index=self._dates, columns=self.columns)
+
+
+def realtime_hpfilter(panel, lamb=1600):
+    """
+    One-sided HP filter: the end-of-sample estimate at every date
+
+    Parameters:
+    panel (pd.DataFrame or pd.Series): Series in columns, dates in rows
+    lamb (float): Smoothing parameter
+
+    Returns:
+    tuple: (cycle, trend) with the same shape as the input
+    """
+    frame = panel.to_frame() if isinstance(panel, pd.Series) else panel
+    filt = RealtimeHP(list(frame.columns), lamb=lamb)
+    for date, row in zip(frame.index, frame.to_numpy(dtype=float)):
+        filt.update(row, date)
+    trend = filt.history()
+    trend.index = frame.index
+    cycle = frame - trend
+    if isinstance(panel, pd.Series):
+        return cycle.iloc[:, 0], trend.iloc[:, 0]
+    return cycle, trend
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from hp_realtime import _T, _init_state, _update, _predict, _diffuse_estimate
+
+
+def _smoothed_trend(values, lamb):
+    """
+    Two-sided HP trend of every column of values, allowing missing values
+
+    Works on the state-space form of hp_realtime. A first augmented Kalman
+    filter pass gives the GLS estimate of each series' diffuse initial state;
+    a second pass starts from that state with zero variance and stores the
+    predictions, gains and innovations, and a backward (de Jong) smoothing
+    recursion then gives the trend at every date. Missing periods simply
+    skip the measurement update, so the trend is interpolated through gaps.
+    The result is the minimizer of the HP objective over the observed
+    periods only.
+
+    Parameters:
+    values (ndarray): (nobs, nseries) array, NaN where not observed
+    lamb (float): Smoothing parameter
+
+    Returns:
+    ndarray: Trend, NaN before each column's first and after its last
+        observation
+    """
+    nobs, nseries = values.shape
+    q = 1.0 / lamb
+    state = _init_state(nseries)
+    for y in values:
+        _update(state, y)
+        _predict(state, q)
+    start = _diffuse_estimate(state)
+
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), nobs)
+    last = np.where(valid.any(axis=0), nobs - 1 - valid[::-1].argmax(axis=0), -1)
+
+    a = start.copy()
+    P = np.zeros((nseries, 2, 2))
+    a_pred = np.empty((nobs, nseries, 2))
+    P_pred = np.empty((nobs, nseries, 2, 2))
+    gain = np.zeros((nobs, nseries, 2))
+    scaled = np.zeros((nobs, nseries))  # v / F
+    for t in range(nobs):
+        a_pred[t], P_pred[t] = a, P
+        obs = valid[t]
+        F = P[:, 0, 0] + 1.0
+        K = np.where(obs[:, None], P[:, :, 0] / F[:, None], 0.0)
+        v = np.where(obs, values[t] - a[:, 0], 0.0)
+        a = a + K * v[:, None]
+        P = P - K[:, :, None] * K[:, None, :] * F[:, None, None]
+        gain[t], scaled[t] = K, v / F
+        started = t >= first
+        a = np.where(started[:, None], a @ _T.T, a)
+        P = np.where(started[:, None, None], _T @ P @ _T.T, P)
+        P[started, 0, 0] += q
+
+    trend = np.full((nobs, nseries), np.nan)
+    r = np.zeros((nseries, 2))
+    for t in range(nobs - 1, -1, -1):
+        # r_{t-1} = Z'v/F + (T (I - K Z))' r_t, with Z = (1, 0)
+        w = r @ _T
+        r = w.copy()
+        r[:, 0] += scaled[t] - np.einsum('ki,ki->k', gain[t], w)
+        trend[t] = a_pred[t][:, 0] + np.einsum('ki,ki->k', P_pred[t][:, 0, :], r)
+    rows = np.arange(nobs)[:, None]
+    trend[(rows < first) | (rows > last)] = np.nan
+    return trend
+
+
+def kalman_hpfilter(panel, lamb=1600):
+    """
+    HP filter for series with missing values, via a Kalman smoother
+
+    Columns may have gaps inside their sample as well as different start
+    and end dates. This is the state-space form of the same estimate that
+    hpfilter_panel computes with weighted banded solves (which is much
+    faster on long series); on complete samples both equal the banded HP
+    solution.
+
+    Parameters:
+    panel (pd.DataFrame, pd.Series or ndarray): Series in columns, dates in
+        rows, typically in logs
+    lamb (float): Smoothing parameter (1600 for quarterly data)
+
+    Returns:
+    tuple: (cycle, trend) shaped like the input. The trend is filled in
+        through internal gaps; the cycle is NaN wherever the data is.
+    """
+    values = np.asarray(panel, dtype=float)
+    trend = _smoothed_trend(values.reshape(len(values), -1), lamb).reshape(values.shape)
+    cycle = values - trend
+    if isinstance(panel, pd.DataFrame):
+        return (pd.DataFrame(cycle, index=panel.index, columns=panel.columns),
+                pd.DataFrame(trend, index=panel.index, columns=panel.columns))
+    if isinstance(panel, pd.Series):
+        return (pd.Series(cycle, index=panel.index, name=panel.name),
+                pd.Series(trend, index=panel.index, name=panel.name))
+    return cycle, trend
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import threading
+import tracemalloc
+import pandas as pd
+
+# Active sinks: callables receiving one event dict per finished stage
+_sinks = []
+_state = threading.local()
+_started_tracemalloc = False
+
+
+class JsonLinesSink:
+    """
+    Append each event as one JSON line to a file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line + '\n')
+
+
+class MemorySink:
+    """
+    Keep events in a list (self.events), e.g. for tests or notebooks
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def frame(self):
+        """
+        Events as a DataFrame, one row per stage
+        """
+        return pd.DataFrame(self.events)
+
+
+def enable(*sinks, memory=True):
+    """
+    Start sending stage events to the given sinks
+
+    Parameters:
+    *sinks: Callables taking an event dict (JsonLinesSink, MemorySink, ...)
+    memory (bool): Track peak memory of each stage with tracemalloc (this
+        slows allocation-heavy code down while enabled)
+    """
+    global _started_tracemalloc
+    _sinks.extend(sinks)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    """
+    Remove all sinks; stage() becomes a no-op again
+    """
+    global _started_tracemalloc
+    _sinks.clear()
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def enabled():
+    return bool(_sinks)
+
+
+def count_series(obj):
+    """
+    Number of series in fetched data, cycles, a panel or a statistics tuple
+    (lists are summed)
+    """
+    if obj is None:
+        return 0
+    if isinstance(obj, dict):
+        return sum(count_series(value) for value in obj.values())
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape[1]
+    if isinstance(obj, list):
+        return sum(count_series(item) for item in obj)
+    if isinstance(obj, tuple):
+        # (cycles, trends) or (std_dev, autocorr, corr_with_gdp)
+        return count_series(obj[0]) if obj else 0
+    if isinstance(obj, pd.Series):
+        # a time series, or one statistic indexed by variable
+        return 1 if isinstance(obj.index, pd.DatetimeIndex) else len(obj)
+    return 1
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, obj):
+        return obj
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.series = None
+
+    def count(self, obj):
+        """
+        Record the number of series in obj as this stage's series count and
+        return obj unchanged
+        """
+        self.series = count_series(obj)
+        return obj
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = getattr(_state, 'stack', None)
+        if stack is None:
+            stack = _state.stack = []
+        self.path = '/'.join([s.name for s in stack] + [self.name])
+        self.memory = tracemalloc.is_tracing()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack and stack[-1].memory:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory = self.peak = current
+        stack.append(self)
+        self.timestamp = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = _state.stack
+        stack.pop()
+        event = {'stage': self.name, 'path': self.path,
+                 'start': pd.Timestamp(self.timestamp, unit='s').isoformat(),
+                 'wall_s': wall, 'cpu_s': cpu, 'series': self.series,
+                 'pid': os.getpid(), 'status': 'ok' if exc_type is None else 'error'}
+        if self.memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            event['peak_bytes'] = self.peak - self.start_memory
+            if stack and stack[-1].memory:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        if exc_type is not None:
+            event['error'] = f"{exc_type.__name__}: {exc}"
+        event.update(self.fields)
+        for sink in list(_sinks):
+            sink(event)
+        return False
+
+
+def stage(name, **fields):
+    """
+    Measure one pipeline stage
+
+    Used as a context manager; on exit an event with the wall time, CPU
+    time, peak traced memory above the stage's starting level, the number of
+    series processed (set with .count(obj)) and any extra fields (e.g.
+    country) goes to every sink. Nested stages are reported with their
+    parents in 'path'. When no sink is enabled this returns a shared no-op
+    object, so instrumented code costs one function call per stage.
+
+    Example:
+        with stage('fetch', country='ES') as st:
+            data = st.count(get_macro_data('ES', start, end))
+    """
+    if not _sinks:
+        return _NULL_STAGE
+    return _Stage(name, fields)
+
+
+if os.environ.get('MACRO_INSTRUMENT'):
+    enable(JsonLinesSink(os.environ['MACRO_INSTRUMENT']))
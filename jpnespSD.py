@@ -1,14 +1,12 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-from statsmodels.tsa.filters.hp_filter import hpfilter
-
-# データ読み込み関数（国ごとに列名を指定）
-def load_and_prepare(file_path, date_col, gdp_col):
-    df = pd.read_csv(file_path)
-    df[date_col] = pd.to_datetime(df[date_col])
-    df.set_index(date_col, inplace=True)
-    df = df['1995-01-01':'2025-01-01']
-    return df[gdp_col]
+from hp_filter import hpfilter
+from series_store import load_series
+
+# データ読み込み関数（日付列・値列は自動検出、列名の指定も可）
+# 初回にバイナリ形式へ変換し、以降は必要な期間だけをメモリマップで読み出す
+def load_and_prepare(file_path, date_col=None, gdp_col=None,
+                     start='1995-01-01', end='2025-01-01'):
+    return load_series(file_path, start, end, column=gdp_col, date_column=date_col)
 
 # HPフィルターを使ってトレンド・循環成分を抽出
 def extract_cycle(series, lamb=1600):
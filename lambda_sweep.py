@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from hp_filter import _valid_spans
+from panel import to_panel
+from moments import _moments, _reference_positions
+
+
+@lru_cache(maxsize=16)
+def _spectral_basis(nobs):
+    """
+    Eigendecomposition of the second-difference penalty K'K
+
+    The HP trend for any lambda is Q diag(1 / (1 + lamb * e)) Q' x, so once
+    (e, Q) is known for a sample length, changing lambda only rescales the
+    spectral coefficients Q'x. The dense eigendecomposition costs O(nobs^3)
+    and O(nobs^2) memory, which is fine for quarterly or monthly samples of
+    up to a few thousand observations.
+
+    Returns:
+    tuple: (eigenvalues, eigenvectors) of K'K
+    """
+    K = np.diff(np.eye(nobs), n=2, axis=0)
+    eigvals, Q = np.linalg.eigh(K.T @ K)
+    # the null space (constants and linear trends) has exactly zero gain
+    eigvals[:2] = 0.0
+    return eigvals, Q
+
+
+@lru_cache(maxsize=16)
+def _lag_basis(nobs, lag):
+    """
+    Sums behind the lag-k autocorrelation, in the eigenbasis of K'K
+
+    Returns:
+    tuple: (Q'1, Q'1[t >= lag], Q'1[t < nobs - lag], Q'S Q), where S is the
+        lag-k shift (S[t, t - lag] = 1), so that for a cycle c = Q b
+        sum_t c_t = (Q'1)'b and sum_t c_t c_{t-lag} = b'(Q'S Q) b
+    """
+    _, Q = _spectral_basis(nobs)
+    t = np.arange(nobs)
+    shift = np.eye(nobs, k=-lag)
+    return (Q.sum(axis=0), Q[t >= lag].sum(axis=0), Q[t < nobs - lag].sum(axis=0),
+            Q.T @ shift @ Q)
+
+
+def _gains(eigvals, lambdas):
+    """
+    Cycle gain of each eigen-frequency for each lambda: (nobs, nlambdas)
+    """
+    gain = np.outer(eigvals, lambdas)
+    return gain / (1.0 + gain)
+
+
+def _coefficients(x):
+    """
+    Spectral coefficients Q'x of the columns of a (nobs, ncols) block
+
+    A linear trend passes through the HP filter untouched, so it is removed
+    first: the coefficients of log levels are then small, and the rounding
+    in Q does not leak the level into the cycle.
+    """
+    nobs = len(x)
+    _, Q = _spectral_basis(nobs)
+    X = np.column_stack([np.ones(nobs), np.arange(nobs)])
+    x = x - X @ np.linalg.lstsq(X, x, rcond=None)[0]
+    return Q.T @ x
+
+
+def _groups(values):
+    """
+    (nobs, columns, rows) for each group of columns sharing a sample length
+    """
+    starts, ends = _valid_spans(values)
+    lengths = ends - starts
+    for nobs in np.unique(lengths[lengths > 0]):
+        cols = np.flatnonzero(lengths == nobs)
+        yield int(nobs), cols, starts[cols] + np.arange(nobs)[:, None]
+
+
+def _sweep_cycles(values, lambdas):
+    """
+    Cyclical components of every column of a (nobs, nseries) array for
+    every lambda, as a (nlambdas, nobs, nseries) array
+    """
+    cycles = np.full((len(lambdas),) + values.shape, np.nan)
+    for nobs, cols, rows in _groups(values):
+        if nobs < 3:
+            cycles[:, rows, cols] = 0.0
+            continue
+        eigvals, Q = _spectral_basis(nobs)
+        coef = _coefficients(values[rows, cols])
+        scaled = _gains(eigvals, lambdas)[:, :, None] * coef[:, None, :]
+        cycle = (Q @ scaled.reshape(nobs, -1)).reshape(nobs, len(lambdas), -1)
+        cycles[:, rows, cols] = cycle.transpose(1, 0, 2)
+    return cycles
+
+
+def _sweep_moments(values, lambdas, ref, lag=1):
+    """
+    std_dev, autocorr and corr_with_gdp of every column for every lambda,
+    each (nlambdas, nseries), without forming the cycles
+
+    With b = gain * Q'x the spectral coefficients of a cycle, the mean and
+    sum of squares are O(nobs) per lambda (Q is orthonormal, so ||c|| =
+    ||b||), as is the cross product with a reference sharing the sample.
+    Only the lag term needs the dense product with Q'S Q. A reference with
+    a different sample falls back to the cycles of that pair on the panel.
+    """
+    nlamb, nseries = len(lambdas), values.shape[1]
+    std_dev, autocorr, corr = (np.full((nlamb, nseries), np.nan) for _ in range(3))
+    starts, ends = _valid_spans(values)
+    coefs, sums, ssqs = {}, np.full((nlamb, nseries), np.nan), np.full((nlamb, nseries), np.nan)
+    for nobs, cols, rows in _groups(values):
+        if nobs < 3:
+            continue
+        eigvals, Q = _spectral_basis(nobs)
+        ones, head, tail, lagged = _lag_basis(nobs, lag)
+        # (nobs, nlambdas, ncols) spectral coefficients of the cycles
+        b = _gains(eigvals, lambdas)[:, :, None] * (_coefficients(values[rows, cols]))[:, None, :]
+        s1 = np.einsum('i,ils->ls', ones, b)
+        ssq = (b ** 2).sum(axis=0) - s1 ** 2 / nobs
+        mean = s1 / nobs
+        cross = (b * (lagged @ b.reshape(nobs, -1)).reshape(b.shape)).sum(axis=0)
+        ends_sum = np.einsum('i,ils->ls', head + tail, b)
+        std_dev[:, cols] = np.sqrt(ssq / (nobs - 1)) * 100
+        autocorr[:, cols] = (cross - mean * ends_sum + mean ** 2 * (nobs - lag)) / ssq
+        sums[:, cols], ssqs[:, cols] = s1, ssq
+        for i, col in enumerate(cols):
+            coefs[col] = b[:, :, i]
+
+    for col in range(nseries):
+        other = ref[col]
+        if col not in coefs or other not in coefs:
+            continue
+        if starts[col] == starts[other] and ends[col] == ends[other]:
+            nobs = ends[col] - starts[col]
+            cov = ((coefs[col] * coefs[other]).sum(axis=0)
+                   - sums[:, col] * sums[:, other] / nobs)
+            corr[:, col] = cov / np.sqrt(ssqs[:, col] * ssqs[:, other])
+        else:
+            pair = _sweep_cycles(values[:, [col, other]], lambdas)
+            corr[:, col] = _moments(pair, np.array([1, 1]), lag)[2][:, 0]
+    return std_dev, autocorr, corr
+
+
+def lambda_sweep(data, lambdas, return_cycles=False, lag=1):
+    """
+    Business cycle moments for a whole grid of HP smoothing parameters
+
+    The lambda-independent part of the HP problem (the eigenbasis of the
+    second-difference penalty) is computed once per sample length, and every
+    lambda is a rescaling of the same spectral coefficients. Volatility and
+    the correlation with GDP then cost O(nobs) per lambda and series; the
+    autocorrelation needs one dense product with the lagged basis, so the
+    whole grid costs O(nobs^2) per lambda and series and pays off for
+    quarterly or monthly samples rather than very long ones. Cycles are only
+    formed when return_cycles is True.
+
+    Parameters:
+    data (dict): {variable: series} or {country: {variable: series}} of raw
+        (level) data, as passed to process_cycle_data
+    lambdas (list): Smoothing parameters to evaluate
+    return_cycles (bool): Also return the cycle panel for each lambda
+    lag (int): Autocorrelation order
+
+    Returns:
+    pd.DataFrame: Moments indexed by (lamb, [country,] variable) with columns
+        std_dev, autocorr and corr_with_gdp
+    dict: {lamb: cycle panel}, only if return_cycles is True
+    """
+    lambdas = np.asarray(lambdas, dtype=float)
+    panel = np.log(to_panel(data))
+    columns = panel.columns
+    std_dev, autocorr, corr = _sweep_moments(panel.to_numpy(), lambdas,
+                                             _reference_positions(columns), lag)
+    index = pd.MultiIndex.from_tuples(
+        [(lamb,) + (col if isinstance(col, tuple) else (col,))
+         for lamb in lambdas for col in columns],
+        names=['lamb'] + list(columns.names))
+    moments = pd.DataFrame({'std_dev': std_dev.ravel(),
+                            'autocorr': autocorr.ravel(),
+                            'corr_with_gdp': corr.ravel()}, index=index)
+    if return_cycles:
+        cycles = _sweep_cycles(panel.to_numpy(), lambdas)
+        cycle_panels = {lamb: pd.DataFrame(cycle, index=panel.index, columns=columns)
+                        for lamb, cycle in zip(lambdas, cycles)}
+        return moments, cycle_panels
+    return moments
@@ -0,0 +1,274 @@
+"""
+Business cycle analysis from the command line
+
+    python macro_cli.py fetch US JP
+    python macro_cli.py decompose ES --method hamilton -o cycles.csv
+    python macro_cli.py stats US JP ES
+    python macro_cli.py compare ES JP
+    python macro_cli.py estimate ES JP
+    python macro_cli.py plot ES JP --out-dir figures
+    python macro_cli.py stream regions.csv --ref national_gdp -o moments.csv
+
+numpy, pandas, scipy and matplotlib are imported inside the subcommands
+that need them, so --help and argument errors return at interpreter
+start-up speed and table-only runs never load matplotlib.
+"""
+import sys
+import argparse
+from settings import SERIES_IDS, COUNTRY_NAMES, START_DATE, END_DATE, LAMBDA
+
+
+def _setup(args):
+    """
+    Turn on memoization and instrumentation when asked for
+    """
+    if getattr(args, 'memo', False):
+        import memo
+        memo.enable()
+    if getattr(args, 'instrument', None):
+        import instrument
+        instrument.enable(instrument.JsonLinesSink(args.instrument))
+
+
+def _fetch(args):
+    """
+    {country: {variable: series}} for the requested countries, through the
+    local FRED cache
+    """
+    from fred_cache import get_many
+    from instrument import stage
+    unknown = [c for c in args.countries if c not in SERIES_IDS]
+    if unknown:
+        raise SystemExit(f"Unknown country code(s) {', '.join(unknown)}; "
+                         f"known: {', '.join(SERIES_IDS)}")
+    table = {c: SERIES_IDS[c] for c in args.countries}
+    with stage('fetch', country=','.join(args.countries)) as st:
+        data, errors = get_many(table, args.start, args.end, offline=args.offline)
+        st.count(data)
+    for error in errors:
+        print(f"warning: {error.key[0]}/{error.key[1]} ({error.series_id}) "
+              f"failed after {error.attempts} attempt(s): {error.error}", file=sys.stderr)
+    return data, errors
+
+
+def _decompose(args):
+    from memo import memoize
+    from instrument import stage
+    from panel import process_panel_data
+    data, _ = _fetch(args)
+    process = memoize('process_cycle_data', split_nested=True)(process_panel_data)
+    params = dict(args.param or [])
+    with stage('filter', country=','.join(data), method=args.method) as st:
+        cycles, trends = st.count(process(data, lamb=args.lamb, method=args.method, **params))
+    return data, cycles, trends
+
+
+def _parse_param(text):
+    key, _, value = text.partition('=')
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got {text!r}")
+    try:
+        value = int(value)
+    except ValueError:
+        try:
+            value = float(value)
+        except ValueError:
+            value = {'true': True, 'false': False}.get(value.lower(), value)
+    return key, value
+
+
+def _write_table(table, args):
+    if args.format == 'csv':
+        text = table.to_csv()
+    elif args.format == 'json':
+        text = table.to_json(orient='split', indent=1)
+    else:
+        text = table.round(args.digits).to_string()
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+def cmd_fetch(args):
+    import pandas as pd
+    data, errors = _fetch(args)
+    rows = [{'country': c, 'variable': v, 'series_id': SERIES_IDS[c][v],
+             'nobs': len(df), 'first': df.index.min(), 'last': df.index.max()}
+            for c, series in data.items() for v, df in series.items()]
+    _write_table(pd.DataFrame(rows).set_index(['country', 'variable']), args)
+    return 1 if errors else 0
+
+
+def cmd_decompose(args):
+    from panel import to_panel
+    _, cycles, trends = _decompose(args)
+    table = to_panel(trends if args.trends else cycles)
+    table.columns = ['_'.join(col) for col in table.columns]
+    _write_table(table, args)
+    return 0
+
+
+def cmd_stats(args):
+    from cross_country import country_statistics_table
+    from instrument import stage
+    _, cycles, _ = _decompose(args)
+    with stage('statistics', country=','.join(cycles)) as st:
+        if args.model:
+            from panel import to_panel
+            from moments import cycle_moments
+            from rbc import model_statistics_table
+            panel = to_panel(st.count(cycles))
+            moments = cycle_moments(panel, lag=args.lag)
+            table = model_statistics_table({c: moments.loc[c] for c in cycles},
+                                           nobs=len(panel), lag=args.lag)
+        elif args.leads_lags is None:
+            table = country_statistics_table(st.count(cycles), lag=args.lag)
+        else:
+            from panel import to_panel
+            from moments import dynamic_correlations
+            table = dynamic_correlations(to_panel(st.count(cycles)), args.leads_lags)
+            table = table.set_index(['country', 'variable', 'reference', 'lag'])
+    _write_table(table, args)
+    return 0
+
+
+def cmd_compare(args):
+    from cross_country import compare_cycles
+    from instrument import stage
+    if len(args.countries) < 2:
+        raise SystemExit("compare needs at least two countries")
+    _, cycles, _ = _decompose(args)
+    with stage('compare', country=','.join(cycles)) as st:
+        table = compare_cycles(st.count(cycles))
+    _write_table(table, args)
+    return 0
+
+
+def cmd_estimate(args):
+    from panel import to_panel
+    from moments import cycle_moments
+    from smm import estimate_countries
+    from instrument import stage
+    _, cycles, _ = _decompose(args)
+    panel = to_panel(cycles)
+    moments = cycle_moments(panel, lag=args.lag)
+    with stage('estimate', country=','.join(cycles)) as st:
+        st.count(cycles)
+        table = estimate_countries({c: moments.loc[c] for c in cycles}, processes=args.processes,
+                                   nobs=len(panel), paths=args.paths, lamb=args.lamb,
+                                   lag=args.lag)
+    _write_table(table, args)
+    return 0
+
+
+def cmd_plot(args):
+    from render import render_figures, trends_job, comparison_job
+    from instrument import stage
+    data, cycles, trends = _decompose(args)
+    names = {c: COUNTRY_NAMES.get(c, c) for c in cycles}
+    jobs = [trends_job(names[c], data[c], cycles[c], trends[c]) for c in cycles]
+    countries = list(cycles)
+    jobs += [comparison_job(names[c1], cycles[c1], names[c2], cycles[c2])
+             for i, c1 in enumerate(countries) for c2 in countries[i + 1:]]
+    with stage('plot', country=','.join(countries)) as st:
+        st.count(cycles)
+        result = render_figures(jobs, args.out_dir, processes=args.processes,
+                                dpi=args.dpi, force=args.force)
+    for filename in result['rendered']:
+        print(f"rendered {filename}")
+    for filename in result['skipped']:
+        print(f"unchanged {filename}")
+    return 0
+
+
+def cmd_stream(args):
+    from streaming import stream_cycles
+    params = dict(args.param or [])
+    table = stream_cycles(args.source, out=args.out, method=args.method, lamb=args.lamb,
+                          ref=args.ref, trends=args.trends, max_values=args.max_values,
+                          store_dir=args.store_dir, **params)
+    _write_table(table, args)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='macro_cli', description=__doc__.strip().split('\n')[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('countries', nargs='+', metavar='COUNTRY',
+                        help=f"Country codes ({', '.join(SERIES_IDS)})")
+    common.add_argument('--start', default=START_DATE, help=f"Start date (default {START_DATE})")
+    common.add_argument('--end', default=END_DATE, help=f"End date (default {END_DATE})")
+    common.add_argument('--offline', action='store_true',
+                        help="Use only cached or local CSV data")
+    common.add_argument('--memo', action='store_true',
+                        help="Reuse memoized results of earlier runs (see memo.py)")
+    common.add_argument('--instrument', metavar='PATH',
+                        help="Append per-stage timing events to a JSON lines file")
+
+    filtering = argparse.ArgumentParser(add_help=False)
+    filtering.add_argument('--method', default='hp', choices=['hp', 'bk', 'cf', 'hamilton'],
+                           help="Trend/cycle filter (default hp)")
+    filtering.add_argument('--lamb', type=float, default=LAMBDA,
+                           help=f"HP smoothing parameter (default {LAMBDA})")
+    filtering.add_argument('--param', type=_parse_param, action='append', metavar='KEY=VALUE',
+                           help="Extra filter parameter, e.g. h=8 for hamilton")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('-o', '--output', help="Write to a file instead of stdout")
+    output.add_argument('--format', default='text', choices=['text', 'csv', 'json'])
+    output.add_argument('--digits', type=int, default=3, help="Rounding of text output")
+
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('fetch', parents=[common, output],
+                       help="Download (or refresh the cache of) each country's series")
+    p.set_defaults(func=cmd_fetch)
+    p = sub.add_parser('decompose', parents=[common, filtering, output],
+                       help="Cyclical (or trend) components of log series")
+    p.add_argument('--trends', action='store_true', help="Output trends instead of cycles")
+    p.set_defaults(func=cmd_decompose)
+    p = sub.add_parser('stats', parents=[common, filtering, output],
+                       help="Volatility, persistence and GDP correlation by country")
+    p.add_argument('--lag', type=int, default=1, help="Autocorrelation order")
+    p.add_argument('--leads-lags', type=int, metavar='K',
+                   help="Output correlations with GDP at leads and lags -K..K instead")
+    p.add_argument('--model', action='store_true',
+                   help="Add the moments of a simulated RBC model (see rbc.py)")
+    p.set_defaults(func=cmd_stats)
+    p = sub.add_parser('compare', parents=[common, filtering, output],
+                       help="Cycle volatility and cross-country correlations")
+    p.set_defaults(func=cmd_compare)
+    p = sub.add_parser('estimate', parents=[common, filtering, output],
+                       help="SMM estimates of RBC parameters for each country")
+    p.add_argument('--lag', type=int, default=1, help="Autocorrelation order")
+    p.add_argument('--paths', type=int, default=50, help="Simulated paths per candidate")
+    p.add_argument('--processes', type=int, help="Worker processes (default: one per CPU)")
+    p.set_defaults(func=cmd_estimate)
+    p = sub.add_parser('plot', parents=[common, filtering],
+                       help="Trend/cycle figures per country and pairwise comparisons")
+    p.add_argument('--out-dir', default='.', help="Output directory")
+    p.add_argument('--dpi', type=int, default=300)
+    p.add_argument('--processes', type=int, help="Render processes (default: one per CPU)")
+    p.add_argument('--force', action='store_true', help="Redraw unchanged figures too")
+    p.set_defaults(func=cmd_plot)
+    p = sub.add_parser('stream', parents=[filtering, output],
+                       help="Filter a very wide CSV or store panel in bounded memory")
+    p.add_argument('source', help="Wide CSV file (one column per series) or store entry")
+    p.add_argument('--ref', help="Column to correlate every series with")
+    p.add_argument('--out', help="Store entry for the cycles (default <entry>_cycle)")
+    p.add_argument('--trends', action='store_true', help="Also store the trends")
+    p.add_argument('--max-values', type=int, default=2 ** 22, help="Values per block")
+    p.add_argument('--store-dir', help="Series store directory")
+    p.set_defaults(func=cmd_stream)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    _setup(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import os
+import glob
+import pickle
+import shutil
+import hashlib
+import inspect
+import functools
+import importlib.util
+import numpy as np
+import pandas as pd
+
+MEMO_DIR = os.environ.get('MACRO_MEMO_DIR', os.path.join('.macro_cache', 'memo'))
+MAX_BYTES = int(float(os.environ.get('MACRO_MEMO_MAX_BYTES', 512 * 2 ** 20)))
+
+# Modules the memoized pipeline functions call into: their source is part of
+# every key, so a fix to the filters or moments never serves stale results
+LIBRARY_MODULES = ('hp_filter', 'hp_smoother', 'hp_realtime', 'filters', 'panel',
+                   'moments', 'cross_country', 'plotting')
+
+# Memoization is opt-in: enable() or MACRO_MEMO=1
+_config = {'enabled': bool(os.environ.get('MACRO_MEMO')), 'dir': MEMO_DIR,
+           'max_bytes': MAX_BYTES}
+
+
+def enable(cache_dir=None, max_bytes=None):
+    """
+    Turn on memoization of the @memoize functions
+
+    Parameters:
+    cache_dir (str): Cache directory (default: MEMO_DIR)
+    max_bytes (int): Size bound; least recently used entries are evicted
+        beyond it (default: MAX_BYTES)
+    """
+    _config.update(enabled=True, dir=cache_dir or MEMO_DIR,
+                   max_bytes=MAX_BYTES if max_bytes is None else max_bytes)
+
+
+def disable():
+    _config['enabled'] = False
+
+
+def _update_hash(h, obj):
+    """
+    Feed data and parameters into a hash, by content
+    """
+    if isinstance(obj, dict):
+        h.update(b'{')
+        for key in sorted(obj, key=repr):
+            h.update(repr(key).encode())
+            _update_hash(h, obj[key])
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'(')
+        for item in obj:
+            _update_hash(h, item)
+        h.update(b')')
+    elif isinstance(obj, (pd.Series, pd.DataFrame)):
+        h.update(repr(getattr(obj, 'name', None) or list(getattr(obj, 'columns', []))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        h.update(repr(obj).encode())
+
+
+def content_hash(*objs):
+    h = hashlib.sha256()
+    _update_hash(h, objs)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def _library_version():
+    """
+    Hash of the source files of LIBRARY_MODULES
+    """
+    h = hashlib.sha256()
+    for module in LIBRARY_MODULES:
+        spec = importlib.util.find_spec(module)
+        h.update(module.encode())
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            with open(spec.origin, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def _function_id(func):
+    """
+    Name, defining file and source of func, and the library version: editing
+    the function, a same-named function in another script or any of
+    LIBRARY_MODULES never reuses its entries
+    """
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ''
+    path = os.path.basename(inspect.getfile(func))
+    return f"{path}:{func.__qualname__}", source, _library_version()
+
+
+def _entry_path(name, key):
+    return os.path.join(_config['dir'], name, f"{key}.pkl")
+
+
+def _load(path):
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass  # evicted meanwhile, or a read-only cache: the entry is still good
+    return entry
+
+
+def _store(path, entry):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    evict()
+
+
+def evict(max_bytes=None):
+    """
+    Delete least recently used entries until the cache fits in max_bytes
+    """
+    max_bytes = _config['max_bytes'] if max_bytes is None else max_bytes
+    entries = []
+    for path in glob.glob(os.path.join(_config['dir'], '*', '*.pkl')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def invalidate(name=None):
+    """
+    Drop cached entries: all of them, or those of one memoized function
+
+    Parameters:
+    name (str): The memoize name (e.g. 'process_cycle_data'); None clears
+        the whole cache
+    """
+    target = _config['dir'] if name is None else os.path.join(_config['dir'], name)
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+
+
+def _split(result, country):
+    if isinstance(result, tuple):
+        return tuple(part.get(country) for part in result)
+    return result.get(country)
+
+
+def _merge(parts):
+    """
+    Reassemble per-country results into the shape a batched call returns
+    """
+    first = next(iter(parts.values()))
+    if isinstance(first, tuple):
+        return tuple({c: part[i] for c, part in parts.items() if part[i] is not None}
+                     for i in range(len(first)))
+    return {c: part for c, part in parts.items() if part is not None}
+
+
+def memoize(name=None, outputs=None, split_nested=False):
+    """
+    Cache a pipeline function on disk, keyed by the content of its inputs
+
+    The key hashes the function's source and the source of LIBRARY_MODULES
+    with the values of all arguments (series data by content, plus
+    parameters such as lamb or the date range), so a changed series,
+    parameter or library module misses and everything else hits. Edits to
+    other modules a function depends on need memo.invalidate(). Calls pass
+    straight through unless memoization is enabled.
+
+    Parameters:
+    name (str): Cache namespace, used by invalidate (default: function name)
+    outputs (callable): Given the call's arguments, returns the files the
+        function writes (e.g. a figure); their bytes are cached with the
+        result and restored on a hit instead of redrawing
+    split_nested (bool): When the first argument is {country: {variable:
+        series}}, cache each country separately and compute only the
+        missing countries in one batched call. The function must return a
+        {country: ...} dict or a tuple of them.
+    """
+    def decorator(func):
+        namespace = name or func.__name__
+        func_id = None
+
+        def cached_call(key, args, kwargs):
+            path = _entry_path(namespace, key)
+            entry = _load(path)
+            files = outputs(*args, **kwargs) if outputs else []
+            if entry is not None:
+                for filename, data in entry['files'].items():
+                    if not os.path.exists(filename) or _read(filename) != data:
+                        with open(filename, 'wb') as f:
+                            f.write(data)
+                return entry['value']
+            value = func(*args, **kwargs)
+            _store(path, {'value': value, 'files': {f: _read(f) for f in files
+                                                     if os.path.exists(f)}})
+            return value
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal func_id
+            if not _config['enabled']:
+                return func(*args, **kwargs)
+            if func_id is None:
+                func_id = _function_id(func)
+            data = args[0] if args else None
+            if not (split_nested and isinstance(data, dict) and data
+                    and all(isinstance(v, dict) for v in data.values())):
+                return cached_call(content_hash(func_id, args, kwargs), args, kwargs)
+
+            rest = args[1:]
+            keys = {c: content_hash(func_id, c, series, rest, kwargs)
+                    for c, series in data.items()}
+            parts = {}
+            for country, key in keys.items():
+                entry = _load(_entry_path(namespace, key))
+                if entry is not None:
+                    parts[country] = entry['value']
+            missing = {c: data[c] for c in data if c not in parts}
+            if missing:
+                result = func(missing, *rest, **kwargs)
+                for country in missing:
+                    parts[country] = _split(result, country)
+                    _store(_entry_path(namespace, keys[country]),
+                           {'value': parts[country], 'files': {}})
+            return _merge({c: parts[c] for c in data})
+
+        wrapper.invalidate = lambda: invalidate(namespace)
+        return wrapper
+    return decorator
+
+
+def _read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
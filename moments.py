@@ -0,0 +1,258 @@
+import numpy as np
+import pandas as pd
+from scipy.fft import rfft, irfft, next_fast_len
+
+STAT_LABELS = {'std_dev': 'Volatility (%)',
+               'autocorr': 'Persistence',
+               'corr_with_gdp': 'Corr. with GDP'}
+
+
+def _moments(values, ref, lag=1):
+    """
+    Volatility, autocorrelation and correlation with a reference column
+    along axis -2 of a (..., nobs, nseries) array, ignoring missing values
+
+    std_dev is the sample standard deviation in percent. autocorr is the
+    lag-k sample autocorrelation (as statsmodels acf: lagged cross products
+    over the total sum of squares), using only pairs where both periods are
+    observed. corr_with_gdp is the Pearson correlation over the periods where
+    both the series and its reference are observed.
+
+    Parameters:
+    values (ndarray): (..., nobs, nseries) array of cyclical components
+    ref (ndarray): Position of the reference column for each series
+    lag (int): Autocorrelation order
+
+    Returns:
+    tuple: (std_dev, autocorr, corr_with_gdp), each (..., nseries)
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=-2)
+    mean = np.where(valid, values, 0.0).sum(axis=-2) / count
+    dev = np.where(valid, values - mean[..., None, :], 0.0)
+    ssq = (dev ** 2).sum(axis=-2)
+    std_dev = np.sqrt(ssq / (count - 1)) * 100
+    autocorr = (dev[..., lag:, :] * dev[..., :-lag, :]).sum(axis=-2) / ssq
+
+    other = values[..., ref]
+    both = valid & ~np.isnan(other)
+    n = both.sum(axis=-2)[..., None, :]
+    x = np.where(both, values, 0.0)
+    y = np.where(both, other, 0.0)
+    x = np.where(both, x - x.sum(axis=-2)[..., None, :] / n, 0.0)
+    y = np.where(both, y - y.sum(axis=-2)[..., None, :] / n, 0.0)
+    corr = (x * y).sum(axis=-2) / np.sqrt((x ** 2).sum(axis=-2) * (y ** 2).sum(axis=-2))
+    return std_dev, autocorr, corr
+
+
+def _reference_positions(columns, ref='gdp'):
+    """
+    Position of each column's reference series: ref itself for a flat panel,
+    (country, ref) for a (country, variable) panel
+    """
+    if isinstance(columns, pd.MultiIndex):
+        keys = [(country, ref) for country in columns.get_level_values(0)]
+    else:
+        keys = [ref] * len(columns)
+    positions = columns.get_indexer(keys)
+    if (positions < 0).any():
+        raise KeyError(f"Every country needs a '{ref}' series to correlate with")
+    return positions
+
+
+def cycle_moments(panel, lag=1, ref='gdp'):
+    """
+    Business cycle moments of every column of a wide cycle panel
+
+    All columns are computed together in one pass over the underlying
+    NumPy array.
+
+    Parameters:
+    panel (pd.DataFrame): Cyclical components, one column per series, with
+        variable or (country, variable) column labels
+    lag (int): Autocorrelation order
+    ref (str): Variable to correlate with
+
+    Returns:
+    pd.DataFrame: One row per column of panel, with columns std_dev,
+        autocorr and corr_with_gdp
+    """
+    std_dev, autocorr, corr = _moments(panel.to_numpy(dtype=float),
+                                       _reference_positions(panel.columns, ref), lag)
+    return pd.DataFrame({'std_dev': std_dev, 'autocorr': autocorr,
+                         'corr_with_gdp': corr}, index=panel.columns)
+
+
+def statistics_table(moments, country=None):
+    """
+    Lay out moments as the business cycle statistics table
+
+    Parameters:
+    moments (pd.DataFrame): Output of cycle_moments, indexed by variable or
+        by (country, variable)
+    country (str): Column label to use when moments cover a single country
+
+    Returns:
+    pd.DataFrame: Variables in rows; (statistic, country) columns in the
+        layout of create_statistics_table
+    """
+    if not isinstance(moments.index, pd.MultiIndex):
+        moments = pd.concat({country: moments}, names=['country'])
+    table = moments.rename(columns=STAT_LABELS).unstack(0)
+    countries = list(dict.fromkeys(moments.index.get_level_values(0)))
+    variables = list(dict.fromkeys(moments.index.get_level_values(1)))
+    columns = pd.MultiIndex.from_product([list(STAT_LABELS.values()), countries])
+    return table.reindex(index=variables, columns=columns)
+
+
+def _window_sums(values, window):
+    """
+    Sums over trailing windows along axis 0 from running (cumulative) sums,
+    so each window costs O(1) whatever its length; window=None expands
+    """
+    running = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+    end = np.arange(1, values.shape[0] + 1)
+    start = np.zeros_like(end) if window is None else np.maximum(end - window, 0)
+    return running[end] - running[start]
+
+
+def rolling_moments(panel, window=None, min_periods=None, ref='gdp'):
+    """
+    Rolling (or expanding) business cycle moments of a wide cycle panel
+
+    Volatility, lag-1 autocorrelation and correlation with GDP are updated
+    from running sums, so every window costs constant time, for all columns
+    at once. Definitions match cycle_moments on the same window.
+
+    Parameters:
+    panel (pd.DataFrame): Cyclical components, as passed to cycle_moments
+    window (int): Window length in periods (None: expanding window)
+    min_periods (int): Minimum observations in a window (default: window,
+        or 3 for an expanding window)
+    ref (str): Variable to correlate with
+
+    Returns:
+    pd.DataFrame: Same index as panel, (statistic, series) columns with
+        statistics std_dev, autocorr and corr_with_gdp
+    """
+    values = panel.to_numpy(dtype=float)
+    # Centre each column first: moments are shift invariant and running sums
+    # of centred data lose less precision
+    values = values - np.nanmean(values, axis=0)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+    if min_periods is None:
+        min_periods = 3 if window is None else window
+
+    n = _window_sums(valid.astype(float), window)
+    s1 = _window_sums(x, window)
+    s2 = _window_sums(x ** 2, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ssq = s2 - s1 ** 2 / n
+        std_dev = np.sqrt(ssq / (n - 1)) * 100
+
+        # Lag-1 cross products over pairs whose two periods are both in the window
+        pair = np.zeros_like(x)
+        pair[1:] = valid[1:] & valid[:-1]
+        lagged = np.zeros_like(x)
+        lagged[1:] = x[:-1]
+        pair_window = None if window is None else window - 1
+        p11 = _window_sums(pair * x * lagged, pair_window)
+        head = _window_sums(pair * lagged, pair_window)
+        tail = _window_sums(pair * x, pair_window)
+        npairs = _window_sums(pair, pair_window)
+        mean = s1 / n
+        autocorr = (p11 - mean * (head + tail) + mean ** 2 * npairs) / ssq
+
+        other = values[:, _reference_positions(panel.columns, ref)]
+        both = valid & ~np.isnan(other)
+        xb = np.where(both, values, 0.0)
+        yb = np.where(both, other, 0.0)
+        nb = _window_sums(both.astype(float), window)
+        sx, sy = _window_sums(xb, window), _window_sums(yb, window)
+        sxx, syy = _window_sums(xb ** 2, window), _window_sums(yb ** 2, window)
+        sxy = _window_sums(xb * yb, window)
+        corr = (sxy - sx * sy / nb) / np.sqrt((sxx - sx ** 2 / nb) * (syy - sy ** 2 / nb))
+
+    short = n < min_periods
+    stats = {name: pd.DataFrame(np.where(short, np.nan, stat), index=panel.index,
+                                columns=panel.columns)
+             for name, stat in [('std_dev', std_dev), ('autocorr', autocorr),
+                                ('corr_with_gdp', corr)]}
+    return pd.concat(stats, axis=1, names=['statistic'])
+
+
+def _pairs(columns, ref):
+    """
+    (series, reference) column positions: each column with its ref series,
+    or with every column of the same country when ref is None
+    """
+    if ref is not None:
+        return np.arange(len(columns)), _reference_positions(columns, ref)
+    groups = (columns.get_level_values(0) if isinstance(columns, pd.MultiIndex)
+              else np.zeros(len(columns)))
+    i, j = np.nonzero(np.asarray(groups)[:, None] == np.asarray(groups)[None, :])
+    return i, j
+
+
+def dynamic_correlations(panel, max_lag=4, ref='gdp'):
+    """
+    Correlations of each series with its reference at leads and lags
+
+    corr(x_{t+k}, ref_t) for k = -max_lag..max_lag, where a peak at k > 0
+    means x lags the reference. Each correlation uses the periods where both
+    x_{t+k} and ref_t are observed (as x.shift(-k).corr(ref) would). The
+    cross sums behind all lags of all pairs come from one batch of FFT
+    cross-correlations of the masked panel.
+
+    Parameters:
+    panel (pd.DataFrame): Cyclical components, as passed to cycle_moments
+    max_lag (int): Largest lead/lag k
+    ref (str): Reference variable, or None for every pair of variables of
+        the same country
+
+    Returns:
+    pd.DataFrame: Tidy table with columns ['country',] 'variable',
+        'reference', 'lag', 'corr' and 'nobs' (the overlapping periods)
+    """
+    values = panel.to_numpy(dtype=float)
+    nobs = values.shape[0]
+    if not 0 <= max_lag < nobs:
+        raise ValueError(f"max_lag must be between 0 and {nobs - 1}")
+    values = values - np.nanmean(values, axis=0)
+    valid = ~np.isnan(values)
+    x = np.where(valid, values, 0.0)
+
+    # Zero padding to nobs + max_lag keeps the circular correlation exact for |k| <= max_lag
+    nfft = next_fast_len(nobs + max_lag, real=True)
+    f_mask = rfft(valid.astype(float), nfft, axis=0)
+    f_x = rfft(x, nfft, axis=0)
+    f_xx = rfft(x ** 2, nfft, axis=0)
+    i, j = _pairs(panel.columns, ref)
+    # sum_t a_{t+k} b_t for (a, b) = (mask, mask), (x, mask), (mask, y),
+    # (x^2, mask), (mask, y^2), (x, y)
+    products = np.stack([f_mask[:, i] * f_mask[:, j].conj(), f_x[:, i] * f_mask[:, j].conj(),
+                         f_mask[:, i] * f_x[:, j].conj(), f_xx[:, i] * f_mask[:, j].conj(),
+                         f_mask[:, i] * f_xx[:, j].conj(), f_x[:, i] * f_x[:, j].conj()])
+    lags = np.arange(-max_lag, max_lag + 1)
+    sums = irfft(products, nfft, axis=1)[:, lags % nfft]
+    n, sx, sy, sxx, syy, sxy = sums
+    n = np.rint(n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (sxy - sx * sy / n) / np.sqrt((sxx - sx ** 2 / n) * (syy - sy ** 2 / n))
+    corr[n < 2] = np.nan
+
+    # one row per (pair, lag), pairs in column order
+    columns = panel.columns
+    table = {}
+    if isinstance(columns, pd.MultiIndex):
+        table['country'] = np.repeat(columns.get_level_values(0)[i], len(lags))
+        names = columns.get_level_values(1)
+    else:
+        names = columns
+    table['variable'] = np.repeat(names[i], len(lags))
+    table['reference'] = np.repeat(names[j], len(lags))
+    table['lag'] = np.tile(lags, len(i))
+    table['corr'] = corr.T.ravel()
+    table['nobs'] = n.T.ravel().astype(int)
+    return pd.DataFrame(table)
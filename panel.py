@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from filters import filter_panel
+
+
+def _as_series(df):
+    """
+    Return a fetched series (DataFrame or Series) as a Series, or None if empty
+    """
+    if df is None or df.empty:
+        return None
+    return df.squeeze(axis=1) if isinstance(df, pd.DataFrame) else df
+
+
+def _flatten(data):
+    """
+    {column label: Series} for flat or nested input, skipping empty entries
+    """
+    columns = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            for var, df in value.items():
+                series = _as_series(df)
+                if series is not None:
+                    columns[(key, var)] = series
+        else:
+            series = _as_series(value)
+            if series is not None:
+                columns[key] = series
+    return columns
+
+
+def alignment_index(data):
+    """
+    Common date index of many series and each series' rows in it
+
+    Computing this once lets to_panel place every series straight into the
+    panel array, instead of reindexing each series (or each pair of series)
+    onto the union of dates.
+
+    Parameters:
+    data (dict): {variable: series} or {country: {variable: series}}
+
+    Returns:
+    tuple: (index, positions) where index is the sorted union of all dates
+        and positions maps each column label to the integer rows of its
+        observations
+    """
+    columns = _flatten(data)
+    if not columns:
+        return pd.Index([]), {}
+    index = columns[next(iter(columns))].index[:0].append(
+        [series.index for series in columns.values()]).unique().sort_values()
+    return index, {key: index.get_indexer(series.index) for key, series in columns.items()}
+
+
+def to_panel(data, alignment=None):
+    """
+    Align a dictionary of series into one wide panel
+
+    Parameters:
+    data (dict): Either {variable: series} for one country, or
+        {country: {variable: series}} for several countries. Series may be
+        one-column DataFrames as returned by get_macro_data; None or empty
+        entries are skipped.
+    alignment (tuple): Output of alignment_index(data), if already computed
+
+    Returns:
+    pd.DataFrame: Panel on the union of all dates. Columns are variables,
+        or a (country, variable) MultiIndex for nested input.
+    """
+    columns = _flatten(data)
+    if not columns:
+        return pd.DataFrame()
+    index, positions = alignment or alignment_index(data)
+    values = np.full((len(index), len(columns)), np.nan)
+    for j, (key, series) in enumerate(columns.items()):
+        values[positions[key], j] = series.to_numpy(dtype=float)
+    if any(isinstance(key, tuple) for key in columns):
+        labels = pd.MultiIndex.from_tuples(list(columns), names=['country', 'variable'])
+    else:
+        labels = pd.Index(list(columns), name='variable')
+    return pd.DataFrame(values, index=index, columns=labels)
+
+
+def from_panel(panel):
+    """
+    Split a wide panel back into dictionaries of series (inverse of to_panel)
+
+    Missing values outside each series' sample are dropped.
+    """
+    values = panel.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    result = {}
+    for j, key in enumerate(panel.columns):
+        rows = valid[:, j]
+        if isinstance(panel.columns, pd.MultiIndex):
+            country, var = key
+            target = result.setdefault(country, {})
+        else:
+            var, target = key, result
+        target[var] = pd.Series(values[rows, j], index=panel.index[rows], name=var)
+    return result
+
+
+def _stack(columns):
+    """
+    (max length, ncolumns) array holding each series' own observations from
+    row 0, NaN-padded below, so every column is filtered on its own dates
+    """
+    values = np.full((max(len(series) for series in columns.values()), len(columns)), np.nan)
+    for j, series in enumerate(columns.values()):
+        values[:len(series), j] = series.to_numpy(dtype=float)
+    return values
+
+
+def _unstack(values, columns):
+    """
+    Series on each column's own dates from a _stack layout, with the nesting
+    of the input and the periods without an estimate dropped
+    """
+    result = {}
+    for j, (key, series) in enumerate(columns.items()):
+        if isinstance(key, tuple):
+            country, var = key
+            target = result.setdefault(country, {})
+        else:
+            var, target = key, result
+        column = values[:len(series), j]
+        rows = ~np.isnan(column)
+        target[var] = pd.Series(column[rows], index=series.index[rows], name=var)
+    return result
+
+
+def process_panel_data(data, lamb=1600, method='hp', **params):
+    """
+    Take logs and extract cyclical components for many series in one call
+
+    Each series is filtered on its own dates, exactly as if it were filtered
+    alone, whatever the dates of the other series in the call (quarter-start
+    and quarter-end or monthly series may be mixed). Series with the same
+    number of observations are filtered together (for the HP filter, against
+    a single factorization; see filters.filter_panel).
+
+    Parameters:
+    data (dict): {variable: series} or {country: {variable: series}}
+    lamb (float): HP smoothing parameter
+    method (str): 'hp', 'bk', 'cf' or 'hamilton'
+    **params: Parameters of the other filters (see filters.py)
+
+    Returns:
+    tuple: (cycles, trends) dictionaries with the same nesting as data
+    """
+    columns = _flatten(data)
+    if not columns:
+        return {}, {}
+    if method == 'hp':
+        params['lamb'] = lamb
+    cycle, trend = filter_panel(np.log(_stack(columns)), method, **params)
+    return _unstack(cycle, columns), _unstack(trend, columns)
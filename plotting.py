@@ -0,0 +1,90 @@
+import numpy as np
+from matplotlib.gridspec import GridSpec
+
+VARIABLES = ['gdp', 'consumption', 'investment']
+STYLE = 'ggplot'
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728',
+          '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
+
+
+def draw_trends_and_cycles(fig, country, raw_data, cycles, trends):
+    """
+    Draw the original data, trend, and cycle for each variable on fig
+
+    Parameters:
+    fig (Figure): Figure to draw on (16 x 12 inches in the scripts)
+    country (str): Country name for the titles
+    raw_data (dict): Raw level data by variable, as from get_macro_data
+    cycles, trends (dict): Output of process_cycle_data
+    """
+    gs = GridSpec(3, 2, figure=fig)
+    for i, var in enumerate(VARIABLES):
+        if var in raw_data and raw_data[var] is not None:
+            ax1 = fig.add_subplot(gs[i, 0])
+            log_data = np.log(raw_data[var])
+            log_data.plot(ax=ax1, label=f"Log {var.capitalize()}")
+            trends[var].plot(ax=ax1, label="Trend", linewidth=2, color='red')
+            ax1.set_title(f"{var.capitalize()} and Trend for {country}")
+            ax1.legend()
+
+            ax2 = fig.add_subplot(gs[i, 1])
+            cycles[var].plot(ax=ax2, label="Cyclical Component", color='green')
+            ax2.set_title(f"{var.capitalize()} Cycle for {country}")
+            ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+            ax2.legend()
+    fig.tight_layout()
+
+
+def draw_cycle_comparison(fig, country1, cycles1, country2, cycles2):
+    """
+    Draw the cycles of two countries side by side, one panel per variable
+
+    Parameters:
+    fig (Figure): Figure to draw on (18 x 5 inches in the scripts)
+    country1, country2 (str): Country names
+    cycles1, cycles2 (dict): Cycles by variable for each country
+    """
+    axes = fig.subplots(1, len(VARIABLES))
+    for ax, var in zip(axes, VARIABLES):
+        if var in cycles1 and var in cycles2:
+            cycles1[var].plot(ax=ax, label=country1, linewidth=1.5)
+            cycles2[var].plot(ax=ax, label=country2, linewidth=1.5)
+            ax.axhline(0, color='black', linestyle='-', alpha=0.3)
+            ax.set_title(f"{var.capitalize()} Cycle: {country1} vs {country2}")
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+
+def trends_filename(country):
+    return f"{country.lower().replace(' ', '_')}_trends_and_cycles.png"
+
+
+def comparison_filename(country1, country2):
+    return f"{country1.lower().replace(' ', '_')}_{country2.lower().replace(' ', '_')}_cycle_comparison.png"
+
+
+def draw_dynamic_correlations(fig, table, reference='gdp'):
+    """
+    Heatmap of lead/lag correlations with a reference variable
+
+    Parameters:
+    fig (Figure): Figure to draw on
+    table (pd.DataFrame): Output of moments.dynamic_correlations
+    reference (str): Reference variable to show
+    """
+    rows = [c for c in ('country', 'variable') if c in table]
+    grid = table[table['reference'] == reference].pivot_table(
+        index=rows, columns='lag', values='corr', sort=False, dropna=False)
+    ax = fig.add_subplot(1, 1, 1)
+    image = ax.imshow(grid.to_numpy(), cmap='RdBu_r', vmin=-1, vmax=1, aspect='auto')
+    ax.set_xticks(range(grid.shape[1]))
+    ax.set_xticklabels(grid.columns)
+    ax.set_yticks(range(grid.shape[0]))
+    ax.set_yticklabels([' '.join(map(str, key)) if isinstance(key, tuple) else key
+                        for key in grid.index])
+    ax.set_xlabel(f"k: corr(x(t+k), {reference}(t))")
+    ax.set_title(f"Dynamic correlations with {reference}")
+    ax.grid(False)
+    fig.colorbar(image, ax=ax)
+    fig.tight_layout()
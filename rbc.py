@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from hp_filter import _hp_trend
+from moments import _moments
+from cross_country import build_statistics_table
+
+# Quarterly calibration: capital share, discount factor, depreciation,
+# relative risk aversion, TFP persistence and TFP shock standard deviation
+PARAMS = {'alpha': 0.36, 'beta': 0.99, 'delta': 0.025, 'sigma': 1.0,
+          'rho': 0.95, 'sigma_e': 0.007}
+VARIABLES = ['gdp', 'consumption', 'investment']
+
+
+def _as_params(params):
+    """
+    Parameter sets as broadcast 1-D arrays: a dict of scalars or arrays, or
+    a DataFrame with one row per set; missing parameters take PARAMS values
+    """
+    if params is None:
+        params = {}
+    elif isinstance(params, pd.DataFrame):
+        params = {col: params[col].to_numpy(dtype=float) for col in params}
+    merged = {**PARAMS, **params}
+    unknown = set(merged) - set(PARAMS)
+    if unknown:
+        raise KeyError(f"Unknown RBC parameters {sorted(unknown)}")
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(merged[k], dtype=float))
+                                   for k in PARAMS])
+    return dict(zip(PARAMS, arrays))
+
+
+def solve(params=None):
+    """
+    Log-linear policy functions of the RBC model, for many parameter sets
+
+    Model: max E sum beta^t (C^(1-sigma) - 1) / (1 - sigma) subject to
+    C + I = Z K^alpha, K' = (1 - delta) K + I and log Z' = rho log Z + e,
+    with labour supply fixed. Around the steady state the policies are
+
+        c_t = eta_ck k_t + eta_cz z_t,   k_{t+1} = eta_kk k_t + eta_kz z_t
+
+    (hats denote log deviations). Substituting them into the linearized
+    resource constraint and Euler equation makes eta_ck the stable
+    (positive) root of a quadratic and eta_cz linear given eta_ck, so the
+    whole parameter grid is solved in closed form at once.
+
+    Parameters:
+    params: dict of scalars/arrays or DataFrame of parameter sets
+
+    Returns:
+    dict: eta_ck, eta_cz, eta_kk, eta_kz and the parameters, as arrays
+        with one entry per parameter set
+    """
+    p = _as_params(params)
+    alpha, beta, delta = p['alpha'], p['beta'], p['delta']
+    sigma, rho = p['sigma'], p['rho']
+    y_k = (1 / beta - 1 + delta) / alpha     # steady-state Y / K
+    c_k = y_k - delta                        # steady-state C / K
+    phi = 1 - beta * (1 - delta)             # beta times the rental rate
+    # Resource constraint: k' = k / beta + y_k z - c_k c
+    a1 = 1 / beta
+    # Euler equation: sigma E c' = sigma c + phi (rho z + (alpha - 1) k')
+    qa = sigma * c_k
+    qb = -(sigma * (a1 - 1) + phi * (alpha - 1) * c_k)
+    qc = phi * (alpha - 1) * a1
+    eta_ck = (-qb + np.sqrt(qb ** 2 - 4 * qa * qc)) / (2 * qa)
+    eta_kk = a1 - c_k * eta_ck
+    eta_cz = ((phi * rho + phi * (alpha - 1) * y_k - sigma * eta_ck * y_k)
+              / (sigma * (rho - 1) - sigma * eta_ck * c_k + phi * (alpha - 1) * c_k))
+    eta_kz = y_k - c_k * eta_cz
+    return dict(p, eta_ck=eta_ck, eta_cz=eta_cz, eta_kk=eta_kk, eta_kz=eta_kz)
+
+
+def draw_shocks(paths, nobs, burn=100, seed=0):
+    """
+    Standard normal TFP innovations, (paths, burn + nobs)
+
+    Passing the same draws to every simulation (common random numbers)
+    makes simulated moments smooth functions of the parameters.
+    """
+    return np.random.default_rng(seed).standard_normal((paths, burn + nobs))
+
+
+def simulate(params=None, nobs=124, paths=100, burn=100, seed=0, shocks=None):
+    """
+    Simulate log deviations of GDP, consumption and investment
+
+    All parameter sets and paths advance together, one period per step,
+    with the same innovations for every parameter set.
+
+    Parameters:
+    params: dict of scalars/arrays or DataFrame of parameter sets
+    nobs (int): Periods kept per path (124 quarters ~ 1994-2025)
+    paths (int): Paths per parameter set
+    burn (int): Periods discarded at the start of each path
+    seed (int): Seed for the innovations
+    shocks (ndarray): (paths, burn + nobs) innovations (default: draw_shocks)
+
+    Returns:
+    ndarray: (nsets, paths, nobs, 3) with variables in VARIABLES order
+    """
+    sol = solve(params)
+    if shocks is None:
+        shocks = draw_shocks(paths, nobs, burn, seed)
+    paths, total = shocks.shape
+    burn = total - nobs
+    col = {key: value[:, None] for key, value in sol.items()}  # (nsets, 1)
+    k = np.zeros((len(sol['alpha']), paths))
+    z = np.zeros_like(k)
+    out = np.empty((len(sol['alpha']), paths, nobs, 3))
+    for t in range(total):
+        z = col['rho'] * z + col['sigma_e'] * shocks[:, t]
+        k_next = col['eta_kk'] * k + col['eta_kz'] * z
+        if t >= burn:
+            out[:, :, t - burn, 0] = z + col['alpha'] * k
+            out[:, :, t - burn, 1] = col['eta_ck'] * k + col['eta_cz'] * z
+            out[:, :, t - burn, 2] = (k_next - (1 - col['delta']) * k) / col['delta']
+        k = k_next
+    return out
+
+
+def simulated_moments(params=None, nobs=124, paths=100, lamb=1600, lag=1, burn=100,
+                      seed=0, shocks=None, max_values=2 ** 22, spread=False):
+    """
+    HP-filtered business cycle moments of the model, averaged over paths
+
+    Each simulated path goes through the same banded HP solve and moment
+    code as the data (one factorization for every path and parameter set).
+    Parameter sets are simulated in blocks of at most max_values values, so
+    a 10^4-point grid runs in bounded memory.
+
+    Parameters:
+    params: dict of scalars/arrays or DataFrame of parameter sets
+    nobs, paths, burn, seed, shocks: As in simulate
+    lamb (float): HP smoothing parameter
+    lag (int): Autocorrelation order
+    max_values (int): Simulated values per block
+    spread (bool): Also return the standard deviation across paths
+
+    Returns:
+    pd.DataFrame: std_dev, autocorr and corr_with_gdp (as cycle_moments)
+        indexed by variable, or by (set, variable) for several parameter
+        sets; with spread=True, (mean, std) across paths as a column level
+    """
+    p = _as_params(params)
+    nsets = len(p['alpha'])
+    if shocks is None:
+        shocks = draw_shocks(paths, nobs, burn, seed)
+    block = max(1, max_values // (shocks.size * 3))
+    mean = np.empty((nsets, 3, 3))
+    std = np.empty((nsets, 3, 3))
+    for lo in range(0, nsets, block):
+        sets = {key: value[lo:lo + block] for key, value in p.items()}
+        sim = simulate(sets, nobs, shocks=shocks)
+        n = sim.shape[0]
+        # HP along time for every (set, path, variable) column at once
+        columns = sim.transpose(2, 0, 1, 3).reshape(nobs, -1)
+        cycle = (columns - _hp_trend(columns, lamb)).reshape(nobs, n, -1, 3).transpose(1, 2, 0, 3)
+        stats = np.stack(_moments(cycle, np.zeros(3, dtype=int), lag), axis=-1)
+        mean[lo:lo + n] = stats.mean(axis=1)
+        std[lo:lo + n] = stats.std(axis=1, ddof=1) if stats.shape[1] > 1 else np.nan
+
+    names = ['std_dev', 'autocorr', 'corr_with_gdp']
+    index = (pd.Index(VARIABLES, name='variable') if nsets == 1 else
+             pd.MultiIndex.from_product([range(nsets), VARIABLES], names=['set', 'variable']))
+    result = pd.DataFrame(mean.reshape(-1, 3), index=index, columns=names)
+    if spread:
+        result = pd.concat({'mean': result,
+                            'std': pd.DataFrame(std.reshape(-1, 3), index=index,
+                                                columns=names)}, axis=1).swaplevel(axis=1)
+        result = result[[(name, kind) for name in names for kind in ('mean', 'std')]]
+    return result
+
+
+def model_statistics_table(data_stats, params=None, label='RBC model', **kwargs):
+    """
+    Simulated moments next to the data moments, in create_statistics_table
+    layout
+
+    Parameters:
+    data_stats (dict): {country: stats} as passed to build_statistics_table
+    params: One parameter set for the model (dict of scalars)
+    label (str): Column label of the model
+    **kwargs: Passed on to simulated_moments (paths, nobs, lamb, ...)
+
+    Returns:
+    pd.DataFrame: Variables in rows, (statistic, country or model) columns
+    """
+    return build_statistics_table({**data_stats, label: simulated_moments(params, **kwargs)})
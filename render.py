@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from memo import _update_hash
+from plotting import (STYLE, COLORS, draw_trends_and_cycles, draw_cycle_comparison,
+                      draw_dynamic_correlations, trends_filename, comparison_filename)
+
+MANIFEST = '.render_manifest.json'
+
+# kind -> (draw function, figure size)
+FIGURES = {
+    'trends': (draw_trends_and_cycles, (16, 12)),
+    'comparison': (draw_cycle_comparison, (18, 5)),
+    'dynamic': (draw_dynamic_correlations, (10, 6)),
+}
+
+
+def trends_job(country, raw_data, cycles, trends, filename=None):
+    """
+    Render job for plot_trends_and_cycles
+    """
+    return {'kind': 'trends', 'filename': filename or trends_filename(country),
+            'args': (country, raw_data, cycles, trends)}
+
+
+def comparison_job(country1, cycles1, country2, cycles2, filename=None):
+    """
+    Render job for plot_cycle_comparison
+    """
+    return {'kind': 'comparison',
+            'filename': filename or comparison_filename(country1, country2),
+            'args': (country1, cycles1, country2, cycles2)}
+
+
+def job_hash(job, dpi=300):
+    """
+    Content hash of a render job: its kind, data, parameters and dpi
+    """
+    h = hashlib.sha256()
+    _update_hash(h, (job['kind'], job['args'], dpi))
+    return h.hexdigest()
+
+
+def dynamic_correlations_job(table, reference='gdp', filename=None):
+    """
+    Render job for a moments.dynamic_correlations heatmap
+    """
+    return {'kind': 'dynamic', 'filename': filename or f"dynamic_correlations_{reference}.png",
+            'args': (table, reference)}
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(job, out_dir, dpi):
+    """
+    Draw one job on a standalone (non-pyplot) figure and save it
+
+    The figure is never registered with pyplot, so nothing is shown and
+    it is released as soon as it goes out of scope.
+    """
+    import matplotlib
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    draw, figsize = FIGURES[job['kind']]
+    with matplotlib.style.context(STYLE), \
+            matplotlib.rc_context({'axes.prop_cycle': matplotlib.cycler(color=COLORS)}):
+        fig = Figure(figsize=figsize)
+        draw(fig, *job['args'])
+        fig.savefig(os.path.join(out_dir, job['filename']), dpi=dpi, bbox_inches='tight')
+    fig.clear()
+    return job['filename']
+
+
+def render_figures(jobs, out_dir='.', processes=None, dpi=300, force=False):
+    """
+    Render many figures headlessly across a process pool
+
+    A figure is skipped when its PNG exists and the hash of its data and
+    plot parameters matches the one recorded at its last render (kept in
+    out_dir/.render_manifest.json).
+
+    Parameters:
+    jobs (list): Jobs from trends_job / comparison_job
+    out_dir (str): Output directory
+    processes (int): Worker processes (None: one per CPU, 1: no pool)
+    dpi (int): Resolution of the PNG files
+    force (bool): Re-render every figure
+
+    Returns:
+    dict: {'rendered': [filenames], 'skipped': [filenames]}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    todo, skipped, hashes = [], [], {}
+    for job in jobs:
+        digest = hashes[job['filename']] = job_hash(job, dpi)
+        if (not force and manifest.get(job['filename']) == digest
+                and os.path.exists(os.path.join(out_dir, job['filename']))):
+            skipped.append(job['filename'])
+        else:
+            todo.append(job)
+
+    if processes == 1 or len(todo) <= 1:
+        rendered = [_render(job, out_dir, dpi) for job in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+            rendered = list(pool.map(_render, todo, [out_dir] * len(todo), [dpi] * len(todo)))
+
+    manifest.update({name: hashes[name] for name in rendered})
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return {'rendered': rendered, 'skipped': skipped}
@@ -0,0 +1,268 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+STORE_DIR = os.environ.get('MACRO_STORE_DIR', os.path.join('.macro_cache', 'store'))
+DATE_NAMES = ('observation_date', 'date', 'DATE', 'Date', 'time', 'period')
+# Values per block when streaming CSV rows or store columns (32 MB of float64)
+MAX_VALUES = 2 ** 22
+
+
+def detect_schema(path, date_column=None, sample_rows=200):
+    """
+    Find the date column and the numeric value columns of a CSV file
+
+    The date column is date_column if given, else the first column with a
+    usual date name, else the first column whose sampled values all parse as
+    dates. Every other column with numeric values (FRED's '.' counts as
+    missing) is a value column.
+
+    Returns:
+    tuple: (date_column, [value columns])
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, na_values='.')
+    if date_column is None:
+        named = [col for col in sample.columns if col in DATE_NAMES]
+        candidates = named or list(sample.columns)
+        for col in candidates:
+            values = sample[col].dropna().astype(str)
+            if len(values) and pd.to_datetime(values, errors='coerce').notna().all():
+                date_column = col
+                break
+        else:
+            raise ValueError(f"No date column found in {path}")
+    # numeric columns are recognised by dtype; only text columns are parsed
+    # one by one, which keeps schema detection fast on very wide files
+    others = sample.drop(columns=date_column)
+    numeric = others.select_dtypes('number')
+    has_values = numeric.notna().any()
+    for col in others.columns.difference(numeric.columns):
+        has_values[col] = pd.to_numeric(others[col], errors='coerce').notna().any()
+    value_columns = [col for col in others.columns if has_values[col]]
+    if not value_columns:
+        raise ValueError(f"No numeric value column found in {path}")
+    return date_column, value_columns
+
+
+def entry_name(path):
+    """
+    Store entry name of a CSV file: its name without extension plus a short
+    hash of its absolute path, so same-named files in different directories
+    (e.g. one gdp.csv per country) get separate entries
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+
+def _store_path(name, store_dir):
+    return os.path.join(store_dir or STORE_DIR, name)
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'source': os.path.abspath(path), 'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns}
+
+
+def _count_rows(path):
+    with open(path, 'rb') as f:
+        rows = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b'\n':
+            rows += 1
+    return rows - 1  # header
+
+
+def ingest_csv(path, store_dir=None, name=None, date_column=None, max_values=MAX_VALUES):
+    """
+    Convert a CSV file into the binary series store (parsed once)
+
+    The store keeps a sorted int64 date index and a (ncolumns, nobs) float64
+    value array as .npy files, so each column is contiguous on disk and can
+    be memory-mapped. The CSV is read in blocks of rows holding at most
+    max_values values and written straight into the memory-mapped array, so
+    panels with tens of thousands of columns never sit in memory at once.
+
+    Parameters:
+    path (str): CSV file
+    store_dir (str): Store directory (default: STORE_DIR)
+    name (str): Store entry name (default: entry_name(path))
+    date_column (str): Date column, if auto-detection should be skipped
+    max_values (int): Values per block read from the CSV
+
+    Returns:
+    str: Name of the store entry
+    """
+    name = name or entry_name(path)
+    date_column, value_columns = detect_schema(path, date_column)
+    nobs = _count_rows(path)
+    chunk_rows = max(1, max_values // max(len(value_columns), 1))
+
+    target = _store_path(name, store_dir)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    values = open_memmap(os.path.join(tmp, 'values.npy'), mode='w+', dtype=np.float64,
+                         shape=(len(value_columns), nobs))
+    index = np.empty(nobs, dtype='int64')
+    lo = 0
+    for chunk in pd.read_csv(path, usecols=[date_column] + value_columns, na_values='.',
+                             chunksize=chunk_rows):
+        hi = lo + len(chunk)
+        index[lo:hi] = pd.to_datetime(chunk[date_column]).to_numpy(dtype='datetime64[ns]').view('int64')
+        block = chunk[value_columns]
+        text = block.columns.difference(block.select_dtypes('number').columns)
+        if len(text):
+            block = block.assign(**{col: pd.to_numeric(block[col], errors='coerce')
+                                    for col in text})
+        block = block.to_numpy(dtype=float)
+        values[:, lo:hi] = block.T
+        lo = hi
+    index, values = index[:lo], values[:, :lo]
+
+    if (np.diff(index) < 0).any():
+        order = np.argsort(index, kind='stable')
+        index = index[order]
+        step = max(1, max_values // max(lo, 1))
+        for c in range(0, len(value_columns), step):
+            values[c:c + step] = values[c:c + step][:, order]
+    values.flush()
+    del values
+    if lo < nobs:  # blank trailing lines: rewrite the array at its real length
+        full = np.load(os.path.join(tmp, 'values.npy'), mmap_mode='r')
+        trimmed = open_memmap(os.path.join(tmp, 'values.trim.npy'), mode='w+',
+                              dtype=np.float64, shape=(len(value_columns), lo))
+        trimmed[:] = full[:, :lo]
+        trimmed.flush()
+        del full, trimmed
+        os.replace(os.path.join(tmp, 'values.trim.npy'), os.path.join(tmp, 'values.npy'))
+    np.save(os.path.join(tmp, 'index.npy'), index)
+    meta = dict(_source_signature(path), columns=value_columns, date_column=date_column)
+    _commit_entry(tmp, target, meta)
+    return name
+
+
+def _commit_entry(tmp, target, meta):
+    """
+    Write meta.json into a fully written temporary entry and move it into place
+    """
+    with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    if os.path.exists(target):
+        shutil.rmtree(target)
+    os.replace(tmp, target)
+
+
+def create_entry(name, dates, columns, store_dir=None, meta=None):
+    """
+    Start a new store entry to be filled column block by column block
+
+    Returns:
+    tuple: (values, commit) where values is a writable (ncolumns, nobs)
+        memory map and commit() publishes the entry once it is filled
+    """
+    target = _store_path(name, store_dir)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, 'index.npy'),
+            np.asarray(dates, dtype='datetime64[ns]').view('int64'))
+    values = open_memmap(os.path.join(tmp, 'values.npy'), mode='w+', dtype=np.float64,
+                         shape=(len(columns), len(dates)))
+
+    def commit():
+        values.flush()
+        _commit_entry(tmp, target, dict(meta or {}, columns=list(columns)))
+
+    return values, commit
+
+
+def ingest_directory(directory, store_dir=None, pattern='*.csv'):
+    """
+    Ingest every CSV file of a directory that is new or changed since it
+    was last ingested
+
+    Returns:
+    list: Names of the entries that were (re)built
+    """
+    built = []
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        name = entry_name(path)
+        if _is_stale(path, name, store_dir):
+            built.append(ingest_csv(path, store_dir, name))
+    return built
+
+
+def _read_meta(name, store_dir):
+    meta_path = os.path.join(_store_path(name, store_dir), 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _is_stale(path, name, store_dir):
+    meta = _read_meta(name, store_dir)
+    if meta is None:
+        return True
+    signature = _source_signature(path)
+    return any(meta.get(key) != signature[key] for key in signature)
+
+
+def query(name, start=None, end=None, store_dir=None):
+    """
+    Range query on a store entry, returning memory-mapped views
+
+    Parameters:
+    name (str): Store entry name
+    start, end (str or datetime): Inclusive date range (None: open-ended)
+    store_dir (str): Store directory
+
+    Returns:
+    tuple: (dates, values, columns) where dates is a datetime64[ns] view,
+        values a (ncolumns, nobs) view and columns the column names
+    """
+    meta = _read_meta(name, store_dir)
+    if meta is None:
+        raise KeyError(f"{name} is not in the series store")
+    root = _store_path(name, store_dir)
+    index = np.load(os.path.join(root, 'index.npy'), mmap_mode='r')
+    values = np.load(os.path.join(root, 'values.npy'), mmap_mode='r')
+    lo = 0 if start is None else np.searchsorted(index, pd.Timestamp(start).value, 'left')
+    hi = len(index) if end is None else np.searchsorted(index, pd.Timestamp(end).value, 'right')
+    return index[lo:hi].view('datetime64[ns]'), values[:, lo:hi], meta['columns']
+
+
+def load_series(path, start=None, end=None, column=None, store_dir=None, date_column=None):
+    """
+    Load a local CSV series through the store
+
+    The CSV is ingested on first use (or when the file changed); later calls
+    only memory-map the stored arrays and slice the requested date range,
+    without copying the values.
+
+    Parameters:
+    path (str): CSV file, e.g. 'spain_gdp.csv'
+    start, end (str or datetime): Inclusive date range (None: open-ended)
+    column (str): Value column to return (default: all value columns)
+    store_dir (str): Store directory
+    date_column (str): Date column, if auto-detection should be skipped
+
+    Returns:
+    pd.Series or pd.DataFrame: A Series for a single value column, indexed
+        by date
+    """
+    name = entry_name(path)
+    if _is_stale(path, name, store_dir):
+        ingest_csv(path, store_dir, name, date_column)
+    dates, values, columns = query(name, start, end, store_dir)
+    index = pd.DatetimeIndex(dates, name='observation_date')
+    if column is not None:
+        return pd.Series(values[columns.index(column)], index=index, name=column, copy=False)
+    if len(columns) == 1:
+        return pd.Series(values[0], index=index, name=columns[0], copy=False)
+    return pd.DataFrame(values.T, index=index, columns=columns, copy=False)
@@ -0,0 +1,26 @@
+# Shared configuration of the analysis scripts and macro_cli.py
+
+# FRED series of each country: real GDP, private consumption, investment
+SERIES_IDS = {
+    'US': {
+        'gdp': 'GDPC1',                  # Real GDP (Quarterly)
+        'consumption': 'PCECC96',        # Real Personal Consumption Expenditures
+        'investment': 'GPDIC1',          # Real Gross Private Domestic Investment
+    },
+    'JP': {
+        'gdp': 'JPNRGDPEXP',             # Japan Real GDP
+        'consumption': 'JPNPFCEADSMEI',  # Japan Private Final Consumption Expenditure
+        'investment': 'JPNGFCFADSMEI',   # Japan Gross Fixed Capital Formation
+    },
+    'ES': {
+        'gdp': 'CLVMNACSCAB1GQES',       # Spain Real GDP (chain-linked volumes, spain_gdp.csv)
+        'consumption': 'ESPPFCEADSMEI',  # Spain Private Final Consumption Expenditure
+        'investment': 'ESPGFCFADSMEI',   # Spain Gross Fixed Capital Formation
+    },
+}
+
+COUNTRY_NAMES = {'US': 'United States', 'JP': 'Japan', 'ES': 'Spain'}
+
+START_DATE = '1994-01-01'
+END_DATE = '2025-01-01'
+LAMBDA = 1600  # HP smoothing parameter for quarterly data
@@ -0,0 +1,160 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import differential_evolution
+from cross_country import STATS
+from rbc import PARAMS, VARIABLES, draw_shocks, simulated_moments
+
+# Parameters estimated by default and their search bounds
+BOUNDS = {'rho': (0.5, 0.995), 'sigma_e': (0.001, 0.03), 'sigma': (0.5, 6.0)}
+
+
+def _moment_vector(stats):
+    """
+    Data moments as a flat vector over (variable, statistic), from the
+    calculate_statistics tuple of Series or a DataFrame with STATS columns
+    """
+    if not isinstance(stats, pd.DataFrame):
+        stats = pd.concat(dict(zip(STATS, stats)), axis=1)
+    return stats.reindex(index=VARIABLES, columns=STATS).to_numpy(dtype=float).ravel()
+
+
+def _population_moments(x, names, fixed, shocks, nobs, lamb, lag):
+    """
+    Simulated moment vectors, (len(x), 9), for the parameter vectors in the
+    rows of x (module level so that pool workers can run it)
+    """
+    sets = {**fixed, **dict(zip(names, np.asarray(x, dtype=float).T))}
+    moments = simulated_moments(sets, nobs=nobs, shocks=shocks, lamb=lamb, lag=lag)
+    return moments[STATS].to_numpy().reshape(len(x), -1)
+
+
+def moment_weights(params=None, nobs=124, paths=50, burn=100, seed=0, lamb=1600, lag=1):
+    """
+    Diagonal SMM weights: the inverse variance of each moment across
+    simulated samples of the data's length, at a given parameter set
+
+    Moments that do not vary (the correlation of GDP with itself) get
+    weight zero.
+
+    Returns:
+    ndarray: Weights for the 9 (variable, statistic) moments
+    """
+    spread = simulated_moments(params, nobs=nobs, paths=paths, burn=burn, seed=seed,
+                               lamb=lamb, lag=lag, spread=True)
+    var = spread.xs('std', axis=1, level=1)[STATS].to_numpy().ravel() ** 2
+    return np.where(var > 1e-12, 1 / np.where(var > 1e-12, var, 1), 0.0)
+
+
+def estimate(data_stats, bounds=None, fixed=None, nobs=124, paths=50, burn=100, seed=0,
+             lamb=1600, lag=1, weights=None, processes=1, maxiter=200, popsize=15, tol=1e-6,
+             de_seed=0):
+    """
+    Simulated method of moments estimate of RBC parameters for one country
+
+    Minimizes g' W g, where g is the gap between the simulated moments
+    (path averages from rbc.simulated_moments) and the data moments. The
+    innovations are drawn once and reused for every candidate (common
+    random numbers), so the objective is a smooth, deterministic function
+    of the parameters. Differential evolution hands over its whole
+    population each generation; candidates already evaluated come from a
+    cache, and the others are simulated together as one parameter grid,
+    split across a process pool when processes > 1.
+
+    Parameters:
+    data_stats: calculate_statistics output (tuple of Series or DataFrame)
+    bounds (dict): {parameter: (low, high)} to estimate (default BOUNDS)
+    fixed (dict): Values of other parameters (default: rbc.PARAMS)
+    nobs (int): Simulated sample length (the data's number of quarters)
+    paths (int): Simulated paths per candidate
+    burn, seed: As in rbc.simulate
+    lamb (float): HP smoothing parameter
+    lag (int): Autocorrelation order
+    weights (ndarray): Diagonal weights for the 9 moments (default:
+        moment_weights at the fixed values and the middle of the bounds)
+    processes (int): Worker processes (None: one per CPU, 1: no pool)
+    maxiter, popsize, tol, de_seed: differential_evolution settings
+
+    Returns:
+    pd.Series: Estimates, objective ('distance'), number of simulated
+        candidates ('evaluations') and cache hits ('cached')
+    """
+    bounds = dict(BOUNDS if bounds is None else bounds)
+    names = list(bounds)
+    fixed = {k: v for k, v in {**PARAMS, **(fixed or {})}.items() if k not in bounds}
+    target = _moment_vector(data_stats)
+    if weights is None:
+        weights = moment_weights({**fixed, **{k: np.mean(b) for k, b in bounds.items()}},
+                                 nobs, paths, burn, seed, lamb, lag)
+    weights = np.where(np.isnan(target), 0.0, weights)
+    target = np.nan_to_num(target)
+    shocks = draw_shocks(paths, nobs, burn, seed)
+    settings = (names, fixed, shocks, nobs, lamb, lag)
+
+    cache = {}
+    counts = {'evaluations': 0, 'cached': 0}
+    pool = None
+    if processes != 1:
+        workers = processes or os.cpu_count()
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    def objective(x):
+        # (nparams, ncandidates) from the vectorized search, (nparams,) when polishing
+        single = np.ndim(x) == 1
+        x = np.atleast_2d(np.asarray(x, dtype=float).T)
+        keys = [row.tobytes() for row in x]
+        todo = list({key: row for key, row in zip(keys, x) if key not in cache}.items())
+        counts['cached'] += len(keys) - len(todo)
+        counts['evaluations'] += len(todo)
+        if todo:
+            rows = np.array([row for _, row in todo])
+            if pool is None:
+                sim = _population_moments(rows, *settings)
+            else:
+                chunks = np.array_split(rows, min(workers, len(rows)))
+                sim = np.vstack(list(pool.map(_population_moments, chunks,
+                                              *[[s] * len(chunks) for s in settings])))
+            gap = sim - target
+            cache.update(zip([key for key, _ in todo], (gap ** 2 * weights).sum(axis=1)))
+        values = np.array([cache[key] for key in keys])
+        return values[0] if single else values
+
+    try:
+        result = differential_evolution(objective, list(bounds.values()), maxiter=maxiter,
+                                        popsize=popsize, tol=tol, seed=de_seed, polish=True,
+                                        vectorized=True, updating='deferred')
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pd.Series({**dict(zip(names, result.x)), 'distance': result.fun, **counts})
+
+
+def _estimate_country(item, kwargs):
+    country, stats = item
+    return country, estimate(stats, processes=1, **kwargs)
+
+
+def estimate_countries(stats_by_country, processes=None, **kwargs):
+    """
+    SMM estimates for many countries, one country per pool worker
+
+    Every country is estimated with the same simulation draws, so
+    differences in estimates come from the data alone.
+
+    Parameters:
+    stats_by_country (dict): {country: stats} as passed to
+        build_statistics_table
+    processes (int): Worker processes (None: one per CPU, 1: no pool)
+    **kwargs: Passed on to estimate
+
+    Returns:
+    pd.DataFrame: One row of estimate output per country
+    """
+    items = list(stats_by_country.items())
+    if processes == 1 or len(items) <= 1:
+        results = [_estimate_country(item, kwargs) for item in items]
+    else:
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as pool:
+            results = list(pool.map(_estimate_country, items, [kwargs] * len(items)))
+    return pd.DataFrame({country: row for country, row in results}).T.rename_axis('country')
@@ -1,19 +1,15 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from statsmodels.tsa.filters.hp_filter import hpfilter
+from hp_filter import hpfilter
+from series_store import load_series
 
-# ① CSVファイル読み込み
-df = pd.read_csv('spain_gdp.csv')
-print(df.head())     # 最初の5行を表示
-print(df.columns)    # 列名一覧を表示
+# ① CSVファイル読み込み（日付列とGDP列は自動検出）
+gdp = load_series('spain_gdp.csv')
+print(gdp.head())     # 最初の5行を表示
+print(gdp.name)       # GDP列の列名を表示
 
-# 日付列（observation_date列）を日時型に変換し、インデックスに設定
-df['observation_date'] = pd.to_datetime(df['observation_date'])
-df.set_index('observation_date', inplace=True)
-
-# ② 対数変換（CLVMNACSCAB1GQES列がGDP値）
-df_log = np.log(df['CLVMNACSCAB1GQES'])
+# ② 対数変換
+df_log = np.log(gdp)
 
 # ③ HPフィルターでトレンドとサイクルに分解（lamb=1600は四半期データの標準）
 cycle, trend = hpfilter(df_log, lamb=1600)
@@ -1,157 +1,107 @@
-import pandas as pd
-import pandas_datareader.data as web
 import matplotlib.pyplot as plt
-import statsmodels.api as sm
-import numpy as np
 from datetime import datetime
-from statsmodels.tsa.stattools import acf
-from matplotlib.gridspec import GridSpec
+from panel import process_panel_data, to_panel
+from moments import cycle_moments
+from cross_country import build_statistics_table
+from plotting import (draw_trends_and_cycles, draw_cycle_comparison,
+                      trends_filename, comparison_filename)
+from fred_cache import get_many
+from memo import memoize
+from settings import SERIES_IDS, START_DATE, END_DATE
+from instrument import stage
 
 plt.style.use('ggplot')
 plt.rcParams['axes.prop_cycle'] = plt.cycler(color=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', 
                                                     '#9467bd', '#8c564b', '#e377c2', '#7f7f7f'])
 
-start_date = '1994-01-01'
-end_date = '2025-01-01'
+start_date = START_DATE
+end_date = END_DATE
 
-def get_macro_data(country_code, start_date, end_date):
+def get_macro_data(country_code, start_date, end_date, offline=False, return_errors=False):
     """
     Fetch macroeconomic data for a specific country from FRED
     
     Parameters:
     country_code (str): 'US', 'JP', or 'ES'
+    offline (bool): Serve only from the local cache or CSV downloads
+    return_errors (bool): Also return the FetchError records of failed series
     
     Returns:
     dict: Dictionary containing DataFrames for GDP, consumption, and investment
+        (series that could not be fetched are left out)
     """
-    data = {}
-    series_ids = {
-        'US': {
-            'gdp': 'GDPC1',              # Real GDP (Quarterly)
-            'consumption': 'PCECC96',     # Real Personal Consumption Expenditures
-            'investment': 'GPDIC1',       # Real Gross Private Domestic Investment
-        },
-        'JP': {
-            'gdp': 'JPNRGDPEXP',         # Japan Real GDP
-            'consumption': 'JPNPFCEADSMEI', # Japan Private Final Consumption Expenditure
-            'investment': 'JPNGFCFADSMEI', # Japan Gross Fixed Capital Formation
-        },
-        'ES': {
-            # 以下は例示、実際にFREDにあるスペインのマクロ指標IDに置き換えてください
-            'gdp': 'CLVMNACNSAB1GQES',        # Spain Real GDP (例)
-            'consumption': 'PCES',             # Spain Private Consumption (仮のID)
-            'investment': 'GFCEES',            # Spain Gross Fixed Capital Formation (仮のID)
-        }
-    }
-
-    for var, series_id in series_ids.get(country_code, {}).items():
-        try:
-            data[var] = web.DataReader(series_id, 'fred', start_date, end_date)
-        except Exception as e:
-            print(f"Error fetching {var} data for {country_code}: {e}")
-            data[var] = None
+    data, errors = get_many({country_code: SERIES_IDS.get(country_code, {})}, start_date, end_date, offline=offline)
+    data = data[country_code]
+    if return_errors:
+        return data, errors
     return data
 
-def process_cycle_data(data, lamb=1600):
-    cycles = {}
-    trends = {}
-    for var, df in data.items():
-        if df is not None and not df.empty:
-            series = df.squeeze()
-            log_data = np.log(series)
-            cycle, trend = sm.tsa.filters.hpfilter(log_data, lamb=lamb)
-            cycles[var] = cycle
-            trends[var] = trend
-    return cycles, trends
+@memoize(split_nested=True)
+def process_cycle_data(data, lamb=1600, method='hp', **params):
+    return process_panel_data(data, lamb=lamb, method=method, **params)
 
+@memoize()
 def calculate_statistics(cycles):
-    cycle_df = pd.DataFrame({var: cycle for var, cycle in cycles.items()})
-    std_dev = cycle_df.std() * 100
-    autocorr = pd.Series({var: acf(cycle_df[var].dropna(), nlags=1)[1] for var in cycle_df.columns})
-    corr_with_gdp = cycle_df.corr()['gdp']
-    return std_dev, autocorr, corr_with_gdp
+    moments = cycle_moments(to_panel(cycles))
+    return moments['std_dev'], moments['autocorr'], moments['corr_with_gdp']
 
+@memoize('plot', outputs=lambda country, *args: [trends_filename(country)])
 def plot_trends_and_cycles(country, raw_data, cycles, trends):
-    variables = ['gdp', 'consumption', 'investment']
     fig = plt.figure(figsize=(16, 12))
-    gs = GridSpec(3, 2, figure=fig)
-    for i, var in enumerate(variables):
-        if var in raw_data and raw_data[var] is not None:
-            ax1 = fig.add_subplot(gs[i, 0])
-            log_data = np.log(raw_data[var])
-            log_data.plot(ax=ax1, label=f"Log {var.capitalize()}")
-            trends[var].plot(ax=ax1, label="Trend", linewidth=2, color='red')
-            ax1.set_title(f"{var.capitalize()} and Trend for {country}")
-            ax1.legend()
-            
-            ax2 = fig.add_subplot(gs[i, 1])
-            cycles[var].plot(ax=ax2, label="Cyclical Component", color='green')
-            ax2.set_title(f"{var.capitalize()} Cycle for {country}")
-            ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
-            ax2.legend()
-    plt.tight_layout()
-    plt.savefig(f"{country.lower().replace(' ', '_')}_trends_and_cycles.png", dpi=300, bbox_inches='tight')
+    draw_trends_and_cycles(fig, country, raw_data, cycles, trends)
+    plt.savefig(trends_filename(country), dpi=300, bbox_inches='tight')
     plt.show()
 
 # 以下の関数は共通なのでそのまま
 def create_statistics_table(spain_stats, us_stats):
-    sp_std, sp_auto, sp_corr = spain_stats
-    us_std, us_auto, us_corr = us_stats
-    
-    stats_data = {
-        ('Volatility (%)', 'Spain'): sp_std,
-        ('Volatility (%)', 'US'): us_std,
-        ('Persistence', 'Spain'): sp_auto,
-        ('Persistence', 'US'): us_auto,
-        ('Corr. with GDP', 'Spain'): sp_corr,
-        ('Corr. with GDP', 'US'): us_corr
-    }
-    
-    columns = pd.MultiIndex.from_tuples(stats_data.keys())
-    stats_df = pd.DataFrame(stats_data, index=['gdp', 'consumption', 'investment'])
-    return stats_df
+    return build_statistics_table({'Spain': spain_stats, 'US': us_stats})
 
 def analyze_business_cycles():
-    print("Fetching Spain macroeconomic data...")
-    sp_data = get_macro_data('ES', start_date, end_date)
-    
-    print("Fetching US macroeconomic data...")
-    us_data = get_macro_data('US', start_date, end_date)
-    
-    print("Processing Spain data...")
-    sp_cycles, sp_trends = process_cycle_data(sp_data)
-    
-    print("Processing US data...")
-    us_cycles, us_trends = process_cycle_data(us_data)
-    
-    print("Calculating statistics...")
-    sp_stats = calculate_statistics(sp_cycles)
-    us_stats = calculate_statistics(us_cycles)
-    
-    print("Creating comparison table...")
-    stats_table = create_statistics_table(sp_stats, us_stats)
-    print("\nBusiness Cycle Statistics:\n")
-    print(stats_table.round(3))
-    
-    print("\nPlotting trends and cycles for Spain...")
-    plot_trends_and_cycles("Spain", sp_data, sp_cycles, sp_trends)
-    
-    print("Plotting trends and cycles for US...")
-    plot_trends_and_cycles("United States", us_data, us_cycles, us_trends)
-    
-    fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-    variables = ['gdp', 'consumption', 'investment']
-    for i, var in enumerate(variables):
-        if var in sp_cycles and var in us_cycles:
-            sp_cycles[var].plot(ax=axes[i], label=f"Spain {var.capitalize()}", linewidth=1.5)
-            us_cycles[var].plot(ax=axes[i], label=f"US {var.capitalize()}", linewidth=1.5)
-            axes[i].set_title(f"{var.capitalize()} Cycle: Spain vs US")
-            axes[i].axhline(y=0, color='black', linestyle='-', alpha=0.3)
-            axes[i].legend()
-            axes[i].grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig("spain_us_cycle_comparison.png", dpi=300, bbox_inches='tight')
-    plt.show()
+    # 各段階の時間・メモリは instrument.enable(...) で有効にしたシンクに送られる
+    with stage('analyze_business_cycles'):
+        print("Fetching Spain macroeconomic data...")
+        with stage('fetch', country='ES') as st:
+            sp_data = st.count(get_macro_data('ES', start_date, end_date))
+
+        print("Fetching US macroeconomic data...")
+        with stage('fetch', country='US') as st:
+            us_data = st.count(get_macro_data('US', start_date, end_date))
+
+        print("Processing Spain data...")
+        with stage('filter', country='ES') as st:
+            sp_cycles, sp_trends = st.count(process_cycle_data(sp_data))
+
+        print("Processing US data...")
+        with stage('filter', country='US') as st:
+            us_cycles, us_trends = st.count(process_cycle_data(us_data))
+
+        print("Calculating statistics...")
+        with stage('statistics', country='ES') as st:
+            sp_stats = calculate_statistics(st.count(sp_cycles))
+        with stage('statistics', country='US') as st:
+            us_stats = calculate_statistics(st.count(us_cycles))
+
+        print("Creating comparison table...")
+        with stage('table') as st:
+            st.count([sp_cycles, us_cycles])
+            stats_table = create_statistics_table(sp_stats, us_stats)
+        print("\nBusiness Cycle Statistics:\n")
+        print(stats_table.round(3))
+
+        print("\nPlotting trends and cycles for Spain...")
+        with stage('plot', country='ES') as st:
+            plot_trends_and_cycles("Spain", st.count(sp_data), sp_cycles, sp_trends)
+
+        print("Plotting trends and cycles for US...")
+        with stage('plot', country='US') as st:
+            plot_trends_and_cycles("United States", st.count(us_data), us_cycles, us_trends)
+
+        with stage('plot', country='ES-US') as st:
+            st.count([sp_cycles, us_cycles])
+            fig = plt.figure(figsize=(18, 5))
+            draw_cycle_comparison(fig, "Spain", sp_cycles, "US", us_cycles)
+            plt.savefig(comparison_filename("Spain", "US"), dpi=300, bbox_inches='tight')
+            plt.show()
 
 if __name__ == "__main__":
     analyze_business_cycles()
@@ -0,0 +1,108 @@
+import os
+import numpy as np
+import pandas as pd
+from filters import filter_panel
+from moments import _moments
+from series_store import (MAX_VALUES, entry_name, ingest_csv, query, create_entry,
+                          _is_stale)
+
+
+def _source_entry(source, store_dir, max_values=MAX_VALUES):
+    """
+    Store entry name for a store name or a CSV file (ingested if new or changed)
+    """
+    if source.lower().endswith('.csv') or os.path.exists(source):
+        name = entry_name(source)
+        if _is_stale(source, name, store_dir):
+            ingest_csv(source, store_dir, name, max_values=max_values)
+        return name
+    return source
+
+
+def iter_column_blocks(name, max_values=MAX_VALUES, store_dir=None, start=None, end=None):
+    """
+    Read a store entry a block of columns at a time
+
+    Yields:
+    tuple: (columns, block) where block is an in-memory (nobs, ncolumns)
+        copy of at most max_values values
+    """
+    _, values, columns = query(name, start, end, store_dir)
+    step = max(1, max_values // max(values.shape[1], 1))
+    for c in range(0, len(columns), step):
+        yield columns[c:c + step], np.array(values[c:c + step]).T
+
+
+def stream_cycles(source, out=None, method='hp', lamb=1600, ref=None, lag=1, log=True,
+                  trends=False, max_values=MAX_VALUES, store_dir=None, start=None, end=None,
+                  **params):
+    """
+    Filter a very wide panel block by block with bounded memory
+
+    The panel (a wide CSV file or a series store entry) is read from the
+    memory-mapped store in blocks of columns holding at most max_values
+    values. Each block is filtered, its cycles (and trends) are written to
+    new store entries, and its moments are computed before the next block is
+    read, so peak memory depends on max_values and the series length, not
+    on the number of columns.
+
+    Parameters:
+    source (str): CSV file or store entry name (columns are series)
+    out (str): Store entry for the cycles (default: '<entry>_cycle'; the
+        trends go to '<entry>_trend' when trends=True)
+    method (str): Filter, as in filters.filter_panel
+    lamb (float): HP smoothing parameter
+    ref (str): Column to correlate every series with (e.g. national GDP);
+        None leaves corr_with_gdp empty
+    lag (int): Autocorrelation order
+    log (bool): Take logs of the levels before filtering
+    trends (bool): Also write the trends
+    max_values (int): Values per block
+    store_dir (str): Store directory
+    start, end (str or datetime): Inclusive date range
+    **params: Other filter parameters
+
+    Returns:
+    pd.DataFrame: Moments (std_dev, autocorr, corr_with_gdp) indexed by column
+    """
+    if method == 'hp':
+        params['lamb'] = lamb
+    name = _source_entry(source, store_dir, max_values)
+    dates, values, columns = query(name, start, end, store_dir)
+    out = out or f"{name}_cycle"
+
+    def decompose(block):
+        return filter_panel(np.log(block) if log else block, method, **params)
+
+    ref_cycle = None
+    if ref is not None:
+        ref_cycle = decompose(np.array(values[columns.index(ref)])[:, None])[0]
+    meta = {'source_entry': name, 'method': method, **params}
+    cycle_store, commit_cycles = create_entry(out, dates, columns, store_dir, meta)
+    if trends:
+        trend_store, commit_trends = create_entry(f"{name}_trend", dates, columns,
+                                                  store_dir, meta)
+    del values
+
+    stats = np.full((len(columns), 3), np.nan)
+    c = 0
+    for block_columns, block in iter_column_blocks(name, max_values, store_dir, start, end):
+        width = len(block_columns)
+        cycle, trend = decompose(block)
+        cycle_store[c:c + width] = cycle.T
+        if trends:
+            trend_store[c:c + width] = trend.T
+        if ref_cycle is not None:
+            # the reference cycle rides along as the block's last column
+            moments = _moments(np.hstack([cycle, ref_cycle]), np.full(width + 1, width), lag)
+            stats[c:c + width] = np.column_stack(moments)[:width]
+        else:
+            std_dev, autocorr, _ = _moments(cycle, np.arange(width), lag)
+            stats[c:c + width, :2] = np.column_stack([std_dev, autocorr])
+        c += width
+
+    commit_cycles()
+    if trends:
+        commit_trends()
+    return pd.DataFrame(stats, index=pd.Index(columns, name='variable'),
+                        columns=['std_dev', 'autocorr', 'corr_with_gdp'])
@@ -0,0 +1,138 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from fred_cache import get_series, get_many, _cache_path, _read_entry, _write_entry
+from settings import SERIES_IDS
+
+DATES = pd.date_range('1990-01-01', '2024-10-01', freq='QS')
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeFred:
+    """
+    Stand-in for fetch_fred_csv that records every request
+    """
+
+    def __init__(self):
+        self.values = pd.Series(np.arange(len(DATES), dtype=float), index=DATES)
+        self.calls = []
+
+    def __call__(self, series_id, start, end):
+        self.calls.append((series_id, pd.Timestamp(start), pd.Timestamp(end)))
+        frame = self.values.loc[start:end].to_frame(series_id)
+        frame.index.name = 'DATE'
+        return frame
+
+
+def test_cache_serves_requests_inside_fetched_range(tmp_path):
+    fake = FakeFred()
+    first = get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, fetch=fake)
+    second = get_series('GDP', '2002-01-01', '2008-01-01', cache_dir=tmp_path, fetch=fake)
+    assert len(fake.calls) == 1
+    pd.testing.assert_frame_equal(second, first.loc['2002-01-01':'2008-01-01'],
+                                  check_freq=False)
+    assert list(second.columns) == ['GDP'] and second.index.name == 'DATE'
+
+
+def test_request_past_cached_end_fetches_only_the_tail(tmp_path):
+    fake = FakeFred()
+    get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, fetch=fake)
+    result = get_series('GDP', '2000-01-01', '2015-01-01', cache_dir=tmp_path, fetch=fake)
+    assert fake.calls[-1][1:] == (pd.Timestamp('2010-01-01'), pd.Timestamp('2015-01-01'))
+    pd.testing.assert_series_equal(result['GDP'], fake.values.loc['2000-01-01':'2015-01-01'],
+                                   check_names=False, check_freq=False)
+    entry = _read_entry(_cache_path('GDP', tmp_path))
+    assert entry['start'] == pd.Timestamp('2000-01-01')
+    assert entry['end'] == pd.Timestamp('2015-01-01')
+
+
+def test_expired_entry_refreshes_tail_and_merges_revisions(tmp_path):
+    fake = FakeFred()
+    get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, fetch=fake)
+    get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, ttl=3600, fetch=fake)
+    assert len(fake.calls) == 1
+
+    # the source revises its last observation; an expired entry picks it up
+    fake.values = fake.values.copy()
+    fake.values.loc['2010-01-01'] = -1.0
+    result = get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, ttl=0, fetch=fake)
+    assert fake.calls[-1][1] == pd.Timestamp('2010-01-01')
+    assert result['GDP'].loc['2010-01-01'] == -1.0
+    assert result['GDP'].loc['2000-01-01':'2009-10-01'].equals(
+        fake.values.loc['2000-01-01':'2009-10-01'])
+
+
+def test_non_incremental_refresh_refetches_the_whole_range(tmp_path):
+    fake = FakeFred()
+    get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=tmp_path, fetch=fake)
+    get_series('GDP', '2000-01-01', '2012-01-01', cache_dir=tmp_path, fetch=fake,
+               incremental=False)
+    assert fake.calls[-1][1:] == (pd.Timestamp('2000-01-01'), pd.Timestamp('2012-01-01'))
+
+
+def _no_network(*args):
+    raise AssertionError("offline mode touched the network")
+
+
+def test_offline_serves_cache_local_csv_or_raises(tmp_path):
+    cache_dir, local_dir = tmp_path / 'cache', tmp_path / 'local'
+    local_dir.mkdir()
+    get_series('GDP', '2000-01-01', '2010-01-01', cache_dir=cache_dir, fetch=FakeFred())
+    cached = get_series('GDP', '2001-01-01', '2002-01-01', cache_dir=cache_dir, offline=True,
+                        fetch=_no_network, local_dirs=(str(local_dir),))
+    assert len(cached) == 5
+
+    with pytest.raises(LookupError):
+        get_series('CPI', '2000-01-01', '2010-01-01', cache_dir=cache_dir, offline=True,
+                   fetch=_no_network, local_dirs=(str(local_dir),))
+
+    (local_dir / 'cpi.csv').write_text("observation_date,CPI\n2000-01-01,1.5\n2000-04-01,2.5\n")
+    local = get_series('CPI', '2000-01-01', '2010-01-01', cache_dir=cache_dir, offline=True,
+                       fetch=_no_network, local_dirs=(str(local_dir),))
+    assert local['CPI'].tolist() == [1.5, 2.5]
+
+
+@pytest.mark.parametrize('country', ['ES', 'JP'])
+def test_offline_gdp_comes_from_the_csv_downloads_in_the_repo(tmp_path, country):
+    gdp = get_series(SERIES_IDS[country]['gdp'], '1995-01-01', '2020-01-01', cache_dir=tmp_path,
+                     offline=True, fetch=_no_network, local_dirs=(HERE,))
+    assert len(gdp) == 101 and gdp.notna().all().all()
+
+
+def test_get_many_reports_failed_series(tmp_path):
+    fake = FakeFred()
+
+    def fetch(series_id, start, end):
+        if series_id == 'MISSING':
+            raise ValueError("no such series")
+        return fake(series_id, start, end)
+
+    table = {'US': {'gdp': 'GDP', 'consumption': 'MISSING'}}
+    data, errors = get_many(table, '2000-01-01', '2001-01-01', cache_dir=tmp_path, fetch=fetch)
+    assert list(data['US']) == ['gdp']
+    assert [(e.key, e.series_id, e.attempts) for e in errors] == [(('US', 'consumption'),
+                                                                   'MISSING', 1)]
+
+
+def test_concurrent_writes_of_one_entry_do_not_collide(tmp_path):
+    path = _cache_path('GDP', tmp_path)
+    values = FakeFred().values
+    failures = []
+
+    def write():
+        try:
+            for _ in range(20):
+                _write_entry(path, values, DATES[0], DATES[-1])
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    assert _read_entry(path)['values'].equals(values)
+    assert os.listdir(tmp_path) == ['GDP.npz']
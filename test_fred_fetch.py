@@ -0,0 +1,93 @@
+import threading
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import pandas as pd
+import pytest
+import fred_fetch
+from fred_fetch import FetchError, fetch_fred_csv, fetch_many
+
+DATES = pd.date_range('1990-01-01', '2024-10-01', freq='QS')
+
+
+class MockFredHandler(BaseHTTPRequestHandler):
+    """
+    fredgraph.csv stand-in: FLAKY fails twice with 500, DOWN always fails
+    with 500 and MISSING returns 404
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        series_id = query['id'][0]
+        server = self.server
+        with server.lock:
+            server.requests.append(series_id)
+            attempt = server.requests.count(series_id)
+        if series_id == 'DOWN' or (series_id == 'FLAKY' and attempt <= 2):
+            status, body = 500, b"server error"
+        elif series_id == 'MISSING':
+            status, body = 404, b"not found"
+        else:
+            rows = [f"{d:%Y-%m-%d},{'.' if i == 1 else i}" for i, d in enumerate(DATES)]
+            status, body = 200, "\n".join([f"observation_date,{series_id}"] + rows).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def mock_fred():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockFredHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/graph/fredgraph.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_fred_csv_parses_and_slices(mock_fred, monkeypatch):
+    server, url = mock_fred
+    frame = fetch_fred_csv('GDP', '1990-01-01', '1991-01-01', base_url=url)
+    assert list(frame.columns) == ['GDP'] and frame.index.name == 'DATE'
+    assert len(frame) == 5 and np.isnan(frame['GDP'].iloc[1])
+
+    # FRED_URL is the default endpoint
+    monkeypatch.setattr(fred_fetch, 'FRED_URL', url)
+    assert fetch_fred_csv('GDP', '1990-01-01', '1991-01-01').equals(frame)
+    assert server.requests == ['GDP', 'GDP']
+
+
+def test_fetch_many_retries_transient_errors(mock_fred):
+    server, url = mock_fred
+    ids = {'gdp': 'GDP', 'flaky': 'FLAKY', 'down': 'DOWN', 'missing': 'MISSING'}
+    results, errors = fetch_many(ids, '1990-01-01', '2000-01-01',
+                                 fetch=partial(fetch_fred_csv, base_url=url),
+                                 max_workers=4, retries=2, backoff=0.001)
+    assert sorted(results) == ['flaky', 'gdp']
+    assert results['flaky']['FLAKY'].equals(results['gdp']['GDP'].rename('FLAKY'))
+    errors = {e.key: e for e in errors}
+    assert sorted(errors) == ['down', 'missing']
+    assert isinstance(errors['down'], FetchError)
+    assert errors['down'].attempts == 3 and 'HTTP 500' in errors['down'].error
+    assert errors['missing'].attempts == 1 and 'HTTP 404' in errors['missing'].error
+    assert server.requests.count('FLAKY') == 3 and server.requests.count('DOWN') == 3
+
+
+def test_fetch_many_requests_repeated_series_once(mock_fred):
+    server, url = mock_fred
+    ids = {('US', 'gdp'): 'GDP', ('US', 'output'): 'GDP',
+           ('JP', 'gdp'): 'MISSING', ('ES', 'gdp'): 'MISSING'}
+    results, errors = fetch_many(ids, '1990-01-01', '2000-01-01',
+                                 fetch=partial(fetch_fred_csv, base_url=url), max_workers=4)
+    assert sorted(server.requests) == ['GDP', 'MISSING']
+    assert results[('US', 'gdp')].equals(results[('US', 'output')])
+    assert sorted(e.key for e in errors) == [('ES', 'gdp'), ('JP', 'gdp')]
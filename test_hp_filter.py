@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.tsa.filters.hp_filter import hpfilter as sm_hpfilter
+from hp_filter import hpfilter, hpfilter_panel
+
+LAMBDAS = [6.25, 1600, 129600]
+# Both solvers are exact; the differences left are rounding, which grows with
+# the condition number of the system (~lamb): about 1e-9 at lamb = 129600
+ATOL = 1e-8
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _log_gdp(filename):
+    path = os.path.join(HERE, filename)
+    return np.log(pd.read_csv(path, index_col=0, parse_dates=True).iloc[:, 0])
+
+
+def _random_walk(nobs=5000):
+    rng = np.random.default_rng(0)
+    return pd.Series(np.cumsum(rng.normal(0.005, 0.01, nobs)) + 10, name='rw')
+
+
+SERIES = {'spain_gdp': lambda: _log_gdp('spain_gdp.csv'),
+          'jpn_gdp': lambda: _log_gdp('jpn_gdp.csv'),
+          'random_walk': _random_walk}
+
+
+@pytest.mark.parametrize('lamb', LAMBDAS)
+@pytest.mark.parametrize('series', SERIES)
+def test_hpfilter_matches_statsmodels(series, lamb):
+    x = SERIES[series]()
+    cycle, trend = hpfilter(x, lamb)
+    expected_cycle, expected_trend = sm_hpfilter(x, lamb)
+    assert cycle.name == expected_cycle.name and trend.name == expected_trend.name
+    pd.testing.assert_index_equal(trend.index, expected_trend.index)
+    np.testing.assert_allclose(trend, expected_trend, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(cycle, expected_cycle, rtol=0, atol=ATOL)
+
+
+def test_hpfilter_accepts_arrays():
+    x = _random_walk(200).to_numpy()
+    cycle, trend = hpfilter(x)
+    expected_cycle, expected_trend = sm_hpfilter(x, 1600)
+    np.testing.assert_allclose(trend, expected_trend, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(cycle + trend, x)
+
+
+@pytest.mark.parametrize('lamb', LAMBDAS)
+def test_hpfilter_panel_matches_statsmodels_per_column(lamb):
+    spain, japan = _log_gdp('spain_gdp.csv'), _log_gdp('jpn_gdp.csv')
+    panel = pd.concat({'ES': spain, 'JP': japan, 'JP_short': japan.iloc[4:-8]}, axis=1)
+    cycle, trend = hpfilter_panel(panel, lamb)
+    for column in panel:
+        x = panel[column].dropna()
+        expected_cycle, expected_trend = sm_hpfilter(x, lamb)
+        np.testing.assert_allclose(trend[column].loc[x.index], expected_trend, rtol=0, atol=ATOL)
+        np.testing.assert_allclose(cycle[column].loc[x.index], expected_cycle, rtol=0, atol=ATOL)
+        assert trend[column].drop(x.index).isna().all()
+
+
+def test_hpfilter_rejects_missing_values():
+    x = _random_walk(50)
+    x.iloc[10] = np.nan
+    with pytest.raises(ValueError):
+        hpfilter(x)
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from hp_filter import hpfilter_panel
+from lambda_sweep import lambda_sweep
+from moments import cycle_moments
+from panel import to_panel
+
+LAMBDAS = [6.25, 1600, 129600]
+# as in test_hp_filter: the banded solve rounds at about 1e-10 when lamb is large
+ATOL = 1e-8
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('1995-01-01', periods=120, freq='QS')
+    data = {country: {var: pd.Series(np.exp(np.cumsum(rng.normal(0.005, 0.01, 120)) + 10),
+                                     index=index)
+                      for var in ['gdp', 'consumption', 'investment']}
+            for country in ['ES', 'JP']}
+    # samples that differ from the GDP sample of the same country
+    data['ES']['consumption'] = data['ES']['consumption'].iloc[6:]
+    data['JP']['gdp'] = data['JP']['gdp'].iloc[:-4]
+    return data
+
+
+@pytest.mark.parametrize('lag', [1, 4])
+def test_lambda_sweep_matches_filtering_each_lambda(lag):
+    data = _data()
+    panel = np.log(to_panel(data))
+    moments, cycles = lambda_sweep(data, LAMBDAS, return_cycles=True, lag=lag)
+    for lamb in LAMBDAS:
+        cycle, _ = hpfilter_panel(panel, lamb)
+        pd.testing.assert_frame_equal(moments.loc[lamb], cycle_moments(cycle, lag=lag),
+                                      check_names=False, rtol=0, atol=ATOL)
+        np.testing.assert_allclose(cycles[lamb], cycle, rtol=0, atol=ATOL)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from filters import filter_panel
+from hp_filter import hpfilter
+from panel import process_panel_data
+
+ATOL = 1e-10
+
+
+def _levels(index, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(np.exp(np.cumsum(rng.normal(0.005, 0.01, len(index))) + 10), index=index)
+
+
+def _mixed_grids():
+    """
+    Series on different date grids: quarter-start, quarter-end and monthly
+    """
+    return {'ES': {'gdp': _levels(pd.date_range('1995-01-01', periods=121, freq='QS'), 0),
+                   'consumption': _levels(pd.date_range('1995-03-31', periods=120, freq='QE'), 1)},
+            'JP': {'gdp': _levels(pd.date_range('1994-01-01', periods=372, freq='MS'), 2)}}
+
+
+def test_hp_on_mixed_date_grids_matches_filtering_each_series_alone():
+    data = _mixed_grids()
+    cycles, trends = process_panel_data(data)
+    for country, series in data.items():
+        for var, levels in series.items():
+            cycle, trend = hpfilter(np.log(levels))
+            pd.testing.assert_index_equal(cycles[country][var].index, levels.index)
+            np.testing.assert_allclose(cycles[country][var], cycle, rtol=0, atol=ATOL)
+            np.testing.assert_allclose(trends[country][var], trend, rtol=0, atol=ATOL)
+
+    # a country's result does not depend on the other countries in the call
+    alone, _ = process_panel_data({'ES': data['ES']})
+    for var in data['ES']:
+        pd.testing.assert_series_equal(alone['ES'][var], cycles['ES'][var])
+
+
+@pytest.mark.parametrize('method', ['bk', 'cf', 'hamilton'])
+def test_other_filters_on_mixed_date_grids(method):
+    data = _mixed_grids()
+    cycles, _ = process_panel_data(data, method=method)
+    for country, series in data.items():
+        for var, levels in series.items():
+            alone = filter_panel(np.log(levels).to_frame(), method)[0].iloc[:, 0].dropna()
+            np.testing.assert_allclose(cycles[country][var], alone, rtol=0, atol=ATOL)
+            pd.testing.assert_index_equal(cycles[country][var].index, alone.index)
+
+
+def test_missing_value_inside_a_series_only_affects_that_series():
+    data = _mixed_grids()
+    gdp = data['ES']['gdp'].copy()
+    gdp.iloc[40] = np.nan
+    data['ES']['gdp'] = gdp
+    cycles, trends = process_panel_data(data)
+
+    # weighted HP: minimize the fit over observed periods plus the smoothness penalty
+    y = np.log(gdp).to_numpy()
+    observed = ~np.isnan(y)
+    n = len(y)
+    K = np.diff(np.eye(n), 2, axis=0)
+    expected = np.linalg.solve(np.diag(observed * 1.0) + 1600 * K.T @ K,
+                               np.where(observed, y, 0.0))
+    np.testing.assert_allclose(trends['ES']['gdp'], expected, rtol=0, atol=1e-8)
+    assert len(cycles['ES']['gdp']) == n - 1
+
+    cycle, _ = hpfilter(np.log(data['ES']['consumption']))
+    np.testing.assert_allclose(cycles['ES']['consumption'], cycle, rtol=0, atol=ATOL)
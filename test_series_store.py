@@ -0,0 +1,26 @@
+import os
+from series_store import entry_name, load_series, _read_meta
+
+
+def _write_gdp(directory, values):
+    os.makedirs(directory)
+    path = os.path.join(directory, 'gdp.csv')
+    rows = [f"2000-{3 * i + 1:02d}-01,{v}" for i, v in enumerate(values)]
+    with open(path, 'w') as f:
+        f.write("\n".join(["observation_date,gdp"] + rows) + "\n")
+    return path
+
+
+def test_same_named_files_get_separate_entries(tmp_path):
+    store = str(tmp_path / 'store')
+    spain = _write_gdp(str(tmp_path / 'ES'), [1.0, 2.0, 3.0])
+    japan = _write_gdp(str(tmp_path / 'JP'), [10.0, 20.0])
+    assert entry_name(spain) != entry_name(japan)
+    assert entry_name(spain).startswith('gdp-')
+
+    for _ in range(2):
+        assert load_series(spain, store_dir=store).tolist() == [1.0, 2.0, 3.0]
+        assert load_series(japan, store_dir=store).tolist() == [10.0, 20.0]
+    # both entries stay in place instead of re-ingesting each other
+    assert _read_meta(entry_name(spain), store)['source'] == os.path.abspath(spain)
+    assert _read_meta(entry_name(japan), store)['source'] == os.path.abspath(japan)